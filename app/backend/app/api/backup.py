@@ -14,8 +14,15 @@ import sys
 import traceback
 import json
 
+from anyio import to_thread
+
 from .. import schemas
-from ..services.backup_service import list_backup_files, restore_from_file, create_monthly_backup
+from ..services.backup_service import (
+    list_backup_files,
+    restore_from_file,
+    create_monthly_backup,
+    invalidate_backup_list_cache,
+)
 
 router = APIRouter(prefix="/api/backup", tags=["backup"])
 
@@ -72,7 +79,7 @@ async def list_backups() -> schemas.BackupList:
 async def create_new_backup() -> JSONResponse:
     """Create a new backup file."""
     try:
-        path = create_backup()
+        path = await to_thread.run_sync(create_backup)
         return JSONResponse({
             "message": "Backup created successfully",
             "file": path.name,
@@ -90,7 +97,7 @@ async def restore_backup(filename: str) -> JSONResponse:
         if not backup_path.exists():
             raise HTTPException(status_code=404, detail="Backup file not found")
         
-        result = restore_from_backup(backup_path)
+        result = await to_thread.run_sync(restore_from_backup, backup_path)
         return JSONResponse(result)
     except HTTPException:
         raise
@@ -110,6 +117,7 @@ async def delete_backup(filename: str) -> JSONResponse:
                     shutil.rmtree(candidate)
                 else:
                     candidate.unlink()
+                invalidate_backup_list_cache()
                 return JSONResponse({"message": "Backup deleted successfully"})
         raise HTTPException(status_code=404, detail="Backup file not found")
     except HTTPException:
@@ -148,7 +156,7 @@ async def create_monthly_backup_api(year: int, month: int) -> JSONResponse:
         if year < 2020 or year > 2030:
             raise HTTPException(status_code=400, detail="Year must be between 2020 and 2030")
         
-        path = create_monthly_backup(year, month)
+        path = await to_thread.run_sync(create_monthly_backup, year, month)
         return JSONResponse({
             "message": "Monthly backup created successfully",
             "file": path.name,
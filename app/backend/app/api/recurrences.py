@@ -1,7 +1,8 @@
 from typing import List
 import sqlite3
+from anyio import to_thread
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from .. import schemas
 from ..db import get_db_conn
 from .. import recurrence  # Use direct import instead of service
@@ -9,13 +10,30 @@ from .. import recurrence  # Use direct import instead of service
 router = APIRouter(prefix="/api/recurrences", tags=["recurrences"])
 system_router = APIRouter(prefix="/api/system", tags=["system"])
 
-@router.get("", response_model=List[schemas.Recurrence])
+# Stored recurrence columns (custom_cron exists only on the schema)
+_REC_COLUMNS_SQL = (
+    "id, name, amount, category_id, user_id, frequency, day_of_month, weekday, "
+    "next_charge_date, active, account_id"
+)
+
+# Built by SQLite like the transactions list; custom_cron has no column and
+# active is stored as 0/1, so both are shaped here to match schemas.Recurrence.
+_LIST_RECURRENCES_SQL = (
+    "SELECT json_group_array(json_object("
+    "'name', name, 'amount', amount, 'category_id', category_id, 'user_id', user_id, "
+    "'frequency', frequency, 'day_of_month', day_of_month, 'weekday', weekday, "
+    "'next_charge_date', next_charge_date, 'custom_cron', NULL, 'account_id', account_id, "
+    "'active', json(CASE WHEN active THEN 'true' ELSE 'false' END), 'id', id)) "
+    f"FROM (SELECT {_REC_COLUMNS_SQL} FROM recurrences ORDER BY id)"
+)
+
+@router.get("", responses={200: {"model": List[schemas.Recurrence]}})
 async def api_get_recurrences(
     db_conn: sqlite3.Connection = Depends(get_db_conn),
-) -> List[schemas.Recurrence]:
-    """Get all recurring transactions."""
-    rows = db_conn.execute("SELECT * FROM recurrences").fetchall()
-    return [schemas.Recurrence(**dict(row)) for row in rows]
+) -> Response:
+    """Get all recurring transactions (JSON rendered by SQLite, no per-row models)."""
+    body = db_conn.execute(_LIST_RECURRENCES_SQL).fetchone()[0]
+    return Response(content=body, media_type="application/json")
 
 @router.post("", response_model=schemas.Recurrence)
 async def api_create_recurrence(
@@ -73,7 +91,7 @@ async def api_create_recurrence(
     # Insert according to schema (including optional account_id)
     cur = db_conn.execute(
         "INSERT INTO recurrences (name, amount, category_id, user_id, frequency, day_of_month, weekday, next_charge_date, active, account_id) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING id",
         (
             rec.name,
             rec.amount,
@@ -87,16 +105,17 @@ async def api_create_recurrence(
             rec.account_id,
         ),
     )
+    new_id = cur.fetchone()[0]
     db_conn.commit()
-    new_id = cur.lastrowid
 
     # Immediately materialize missing occurrences up to today
-    # This will also advance next_charge_date as needed
-    inserted = recurrence.apply_recurring()
+    # This will also advance next_charge_date as needed. It opens its own
+    # connection and may insert many rows, so keep it off the event loop.
+    inserted = await to_thread.run_sync(recurrence.apply_recurring)
     # Optionally could use `inserted` for logging/response if needed
 
     # Reload and return the updated recurrence row (reflecting any date advancement)
-    row = db_conn.execute("SELECT * FROM recurrences WHERE id = ?", (new_id,)).fetchone()
+    row = db_conn.execute(f"SELECT {_REC_COLUMNS_SQL} FROM recurrences WHERE id = ?", (new_id,)).fetchone()
     if not row:
         raise HTTPException(status_code=500, detail="Failed to load created recurrence")
     return schemas.Recurrence(**dict(row))
@@ -149,9 +168,8 @@ async def api_update_recurrence(
         raise HTTPException(status_code=400, detail="No fields to update")
     set_clause = ", ".join([f"{k} = ?" for k in fields.keys()])
     params = list(fields.values()) + [rec_id]
-    db_conn.execute(f"UPDATE recurrences SET {set_clause} WHERE id = ?", params)
+    row = db_conn.execute(f"UPDATE recurrences SET {set_clause} WHERE id = ? RETURNING {_REC_COLUMNS_SQL}", params).fetchone()
     db_conn.commit()
-    row = db_conn.execute("SELECT * FROM recurrences WHERE id = ?", (rec_id,)).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Recurrence not found")
     return schemas.Recurrence(**dict(row))
@@ -169,7 +187,7 @@ async def api_delete_recurrence(
 @system_router.post("/apply-recurring")
 async def api_apply_recurring() -> JSONResponse:
     """Run recurrence materialization once, on demand."""
-    inserted = recurrence.apply_recurring()
+    inserted = await to_thread.run_sync(recurrence.apply_recurring)
     return JSONResponse(content={"inserted": inserted, "status": "ok"})
 
 
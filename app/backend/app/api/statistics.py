@@ -3,12 +3,13 @@ Statistics API endpoints for expense tracking and reporting (JSON only).
 """
 
 from fastapi import APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
 from ..db import get_db_conn
 from ..services.cache_service import cache_service
-from datetime import datetime, timedelta
+from anyio import to_thread
+from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+import functools
 import sqlite3
 import logging
 
@@ -16,18 +17,31 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/statistics", tags=["statistics"])
 
-def get_last_6_months() -> List[str]:
-    """Get the last 6 months as YYYY-MM format strings."""
-    today = datetime.today().replace(day=1)
-    months = []
-    for i in range(5, -1, -1):
-        month = (today - relativedelta(months=i)).strftime('%Y-%m')
-        months.append(month)
-    return months
+MATRIX_CACHE_KEY = "statistics_matrix"
+
+@functools.lru_cache(maxsize=8)
+def _months_for(today_iso: str) -> Tuple[str, ...]:
+    """Last 6 months (oldest first) as YYYY-MM strings, relative to today_iso."""
+    first = date.fromisoformat(today_iso).replace(day=1)
+    return tuple(
+        (first - relativedelta(months=i)).strftime('%Y-%m')
+        for i in range(5, -1, -1)
+    )
+
+def get_last_6_months() -> Tuple[str, ...]:
+    """Get the last 6 months as YYYY-MM format strings.
+
+    Memoized per calendar day; the tuple is shared between requests.
+    """
+    return _months_for(date.today().isoformat())
 
 @router.get("")
-def statistics(db_conn=Depends(get_db_conn)):
+async def statistics(db_conn=Depends(get_db_conn)):
     """Main statistics data endpoint - returns JSON with all statistics data."""
+    return await to_thread.run_sync(_compute_statistics, db_conn)
+
+def _compute_statistics(db_conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Run the blocking statistics queries and build the payload."""
     cur = db_conn.cursor()
     
     # Get last 6 months as strings
@@ -282,11 +296,12 @@ def statistics(db_conn=Depends(get_db_conn)):
         "categories_count": categories_count['count'],
     }
     logger.info("Statistics data computed")
-    return JSONResponse(payload)
+    return payload
 
 def _get_top_expenses(cur: sqlite3.Cursor) -> List[Dict[str, Any]]:
     """Get top 5 expenses from last 3 months with caching."""
     cache_key = "top_expenses_3months"
+    cache_service.flush_if_dirty(cache_key)
     top_expenses = cache_service.get(cache_key)
     
     if top_expenses is None:
@@ -323,7 +338,7 @@ def _get_top_expenses(cur: sqlite3.Cursor) -> List[Dict[str, Any]]:
         else:
             return [dict(row) for row in top_expenses]
 
-def _get_recurring_monthly_expenses(cur: sqlite3.Cursor, last_6_months: List[str]) -> List[Dict[str, Any]]:
+def _get_recurring_monthly_expenses(cur: sqlite3.Cursor, last_6_months: Tuple[str, ...]) -> List[Dict[str, Any]]:
     """Get recurring expenses by month for the last 6 months (excluding income categories)."""
     recurring_monthly = cur.execute("""
         SELECT strftime('%Y-%m', t.date) AS month, COALESCE(SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END), 0) AS total
@@ -464,57 +479,88 @@ def _get_cash_vs_credit_data(cur: sqlite3.Cursor) -> List[Dict[str, Any]]:
     return cash_vs_credit
 
 @router.post("/clear-cache")
-def clear_statistics_cache():
+async def clear_statistics_cache():
     """Clear statistics cache when new data is added."""
     cache_service.invalidate("top_expenses_3months")
-    return JSONResponse({"message": "Cache cleared successfully"})
+    cache_service.invalidate(MATRIX_CACHE_KEY)
+    return {"message": "Cache cleared successfully"}
 
 @router.get("/cache-stats")
 def get_cache_stats():
     """Get cache statistics for debugging."""
-    return JSONResponse(cache_service.get_stats())
+    return cache_service.get_stats()
+
+def _get_monthly_matrix(cur: sqlite3.Cursor) -> Dict[str, Any]:
+    """Monthly expenses per category for the last 6 months, in one query (cached for 60s).
+
+    The cache entry is tagged with the trigger-maintained transactions version, so any
+    writer (API, partials, forms, recurrence jobs) invalidates it on the next read.
+
+    Returns {"months": [...], "categories": [...], "values": {category: [v_m1..v_m6], "total": [...]}}.
+    "total" excludes income and savings categories; per-category series include both
+    regular and recurring expenses.
+    """
+    version_row = cur.execute("SELECT version FROM table_versions WHERE name = 'transactions'").fetchone()
+    version = version_row[0] if version_row else 0
+    cache_service.flush_if_dirty(MATRIX_CACHE_KEY)
+    cached = cache_service.get(MATRIX_CACHE_KEY)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    months = list(get_last_6_months())
+    month_index = {ym: i for i, ym in enumerate(months)}
+
+    categories_rows = cur.execute(
+        "SELECT name, COALESCE(is_saving, 0) AS is_saving FROM categories ORDER BY name"
+    ).fetchall()
+    categories = [row["name"] for row in categories_rows]
+    in_total = {
+        row["name"] for row in categories_rows
+        if row["name"] not in ('משכורת', 'קליניקה') and not row["is_saving"]
+    }
+
+    values: Dict[str, List[float]] = {cat: [0] * len(months) for cat in categories}
+    total = [0] * len(months)
+
+    rows = cur.execute("""
+        SELECT strftime('%Y-%m', t.date) AS ym, c.name AS category,
+               COALESCE(SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END), 0) AS expenses
+        FROM transactions t
+        JOIN categories c ON t.category_id = c.id
+        WHERE t.date >= date('now', '-6 months')
+        GROUP BY ym, c.name
+    """).fetchall()
+    for row in rows:
+        idx = month_index.get(row["ym"])
+        if idx is None:
+            continue
+        values[row["category"]][idx] = row["expenses"]
+        if row["category"] in in_total:
+            total[idx] += row["expenses"]
+
+    values["total"] = total
+    matrix = {"months": months, "categories": categories, "values": values}
+    cache_service.set(MATRIX_CACHE_KEY, (version, matrix), ttl_seconds=60)
+    return matrix
+
+@router.get("/matrix")
+async def monthly_matrix_api(db_conn=Depends(get_db_conn)):
+    """Monthly expenses for every category plus the total, so the UI can switch categories client-side."""
+    return await to_thread.run_sync(_get_monthly_matrix, db_conn.cursor())
 
 @router.get("/monthly")
-def monthly_expenses_api(category: str = Query("total"), db_conn=Depends(get_db_conn)):
-    """API endpoint for monthly expenses data."""
-    cur = db_conn.cursor()
-    last_6_months = get_last_6_months()
+async def monthly_expenses_api(category: str = Query("total"), db_conn=Depends(get_db_conn)):
+    """API endpoint for monthly expenses data.
 
-    if category == "total":
-        # Total expenses for each month (excluding income and savings categories)
-        rows = cur.execute("""
-            SELECT strftime('%Y-%m', t.date) AS ym, COALESCE(SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END), 0) AS expenses
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE t.date >= date('now', '-6 months')
-            AND c.name NOT IN ('משכורת', 'קליניקה')
-            AND COALESCE(c.is_saving, 0) = 0
-            GROUP BY ym
-            ORDER BY ym
-        """).fetchall()
-        lookup = {row["ym"]: row["expenses"] for row in rows}
-        result = [
-            {"ym": ym, "expenses": lookup.get(ym, 0)}
-            for ym in last_6_months
-        ]
-    else:
-        # Specific category (including both regular and recurring expenses)
-        rows = cur.execute("""
-            SELECT strftime('%Y-%m', t.date) AS ym, COALESCE(SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END), 0) AS expenses
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE t.date >= date('now', '-6 months')
-            AND c.name = ?
-            GROUP BY ym
-            ORDER BY ym
-        """, (category,)).fetchall()
-        lookup = {row["ym"]: row["expenses"] for row in rows}
-        result = [
-            {"ym": ym, "expenses": lookup.get(ym, 0)}
-            for ym in last_6_months
-        ]
-    
-    return JSONResponse(result)
+    Deprecated: served from the cached /matrix payload; new callers should use /matrix.
+    """
+    matrix = await to_thread.run_sync(_get_monthly_matrix, db_conn.cursor())
+    series = matrix["values"].get(category) or [0] * len(matrix["months"])
+    result = [
+        {"ym": ym, "expenses": value}
+        for ym, value in zip(matrix["months"], series)
+    ]
+    return result
 
 @router.get("/debug")
 def debug_statistics(db_conn=Depends(get_db_conn)):
@@ -575,9 +621,10 @@ def debug_statistics(db_conn=Depends(get_db_conn)):
     
     # Check cache status
     cache_key = "top_expenses_3months"
+    cache_service.flush_if_dirty(cache_key)
     cached_data = cache_service.get(cache_key)
     
-    return JSONResponse({
+    return {
         "current_date": now.strftime('%Y-%m-%d'),
         "three_months_ago": three_months_ago_sql,
         "sql_three_months_ago": cur.execute('SELECT date(\'now\', \'-3 months\')').fetchone()[0],
@@ -587,7 +634,7 @@ def debug_statistics(db_conn=Depends(get_db_conn)):
         "top_expenses_debug": [dict(row) for row in top_expenses_debug],
         "cache_status": "HIT" if cached_data is not None else "MISS",
         "cache_data_length": len(cached_data) if cached_data is not None else 0
-    })
+    }
 
 
 @router.get("/yearly-comparison")
@@ -631,7 +678,7 @@ def yearly_comparison_api(db_conn=Depends(get_db_conn)):
     if previous_ytd > 0:
         ytd_change_pct = (current_ytd - previous_ytd) / previous_ytd * 100
 
-    return JSONResponse({
+    return {
         "current_year": current_year,
         "previous_year": previous_year,
         "current": current,
@@ -640,7 +687,7 @@ def yearly_comparison_api(db_conn=Depends(get_db_conn)):
         "previous_ytd": previous_ytd,
         "previous_total": sum(previous),
         "ytd_change_pct": ytd_change_pct,
-    })
+    }
 
 
 @router.get("/recurrences")
@@ -665,4 +712,4 @@ def recurrences_monthly_api(db_conn=Depends(get_db_conn)):
         {"month": ym, "total": lookup.get(ym, 0)}
         for ym in last_6_months
     ]
-    return JSONResponse(result)
+    return result
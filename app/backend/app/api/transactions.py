@@ -1,25 +1,36 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, FrozenSet, Tuple
+import functools
 import sqlite3
-from io import BytesIO
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
+import tempfile
+import zlib
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from .. import schemas
 from ..db import get_db_conn
 from ..services.cache_service import cache_service
-from openpyxl import Workbook
 
 router = APIRouter(prefix="/api/transactions", tags=["transactions"])
 
 
+INCOME_CATEGORY_NAMES = ("משכורת", "קליניקה")
+INCOME_IDS_CACHE_KEY = "income_category_ids"
+
+
+def _income_category_ids(db_conn: sqlite3.Connection) -> FrozenSet[int]:
+    """Ids of the income categories, cached until categories change (see db.initialise_database)."""
+    ids = cache_service.get(INCOME_IDS_CACHE_KEY)
+    if ids is None:
+        ids = frozenset(
+            row[0] for row in db_conn.execute(
+                "SELECT id FROM categories WHERE name IN (?, ?)", INCOME_CATEGORY_NAMES
+            )
+        )
+        cache_service.set(INCOME_IDS_CACHE_KEY, ids, ttl_seconds=3600)
+    return ids
+
 def _is_income_category(db_conn: sqlite3.Connection, category_id: Optional[int]) -> bool:
     """Return True if the category id corresponds to an income category."""
-    if category_id is None:
-        return False
-    row = db_conn.execute("SELECT name FROM categories WHERE id = ?", (category_id,)).fetchone()
-    if not row:
-        return False
-    name = row[0]
-    return name in ("משכורת", "קליניקה")
+    return category_id is not None and category_id in _income_category_ids(db_conn)
 
 def _is_saving_category(db_conn: sqlite3.Connection, category_id: Optional[int]) -> bool:
     """Return True if the category is marked as a savings category."""
@@ -30,51 +41,129 @@ def _is_saving_category(db_conn: sqlite3.Connection, category_id: Optional[int])
         return False
     return bool(row[0])
 
-@router.get("", response_model=List[schemas.Transaction])
-async def api_get_transactions(
+# Columns a Transaction is built from; RETURNING uses this fixed list so rows
+# have a known shape and from_row() needs no cursor.description lookup.
+_TX_COLS = (
+    "id", "date", "amount", "category_id", "user_id", "account_id",
+    "notes", "tags", "recurrence_id", "period_key",
+)
+_TX_COLUMNS_SQL = ", ".join(_TX_COLS)
+
+# One static statement for every filter combination: unused filters are bound as
+# NULL and short-circuit, so sqlite3's statement cache keeps a single entry.
+# SQLite renders the page as a JSON array itself, so no per-row Python objects
+# are created; the inner ORDER BY/LIMIT subquery fixes the array order.
+_LIST_TRANSACTIONS_SQL = (
+    "SELECT json_group_array(json_object("
+    "'id', id, 'date', date, 'amount', amount, 'category_id', category_id, "
+    "'user_id', user_id, 'account_id', account_id, 'notes', notes, 'tags', tags, "
+    "'recurrence_id', recurrence_id, 'period_key', period_key)) FROM ("
+    f"SELECT {_TX_COLUMNS_SQL} FROM transactions WHERE recurrence_id IS NULL"
+    " AND (:from_date IS NULL OR date >= :from_date)"
+    " AND (:to_date IS NULL OR date <= :to_date)"
+    " AND (:category_id IS NULL OR category_id = :category_id)"
+    " AND (:user_id IS NULL OR user_id = :user_id)"
+    " AND (:before_date IS NULL OR (date, id) < (:before_date, :before_id))"
+    " ORDER BY date DESC, id DESC LIMIT :limit)"
+)
+
+def _transactions_etag(db_conn: sqlite3.Connection, request: Request) -> str:
+    """Weak ETag from the transactions change counter and the query string."""
+    row = db_conn.execute("SELECT version FROM table_versions WHERE name = 'transactions'").fetchone()
+    version = row[0] if row else 0
+    return f'W/"{version}-{zlib.crc32(request.url.query.encode()):08x}"'
+
+@router.get("", responses={200: {"model": List[schemas.Transaction]}})
+def api_get_transactions(
+    request: Request,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
     category_id: Optional[int] = None,
     user_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    before_date: Optional[str] = None,
+    before_id: Optional[int] = None,
     db_conn: sqlite3.Connection = Depends(get_db_conn),
-) -> List[schemas.Transaction]:
-    """Get transactions with optional filtering."""
-    query = "SELECT * FROM transactions WHERE recurrence_id IS NULL"
-    params: List[Any] = []
-    
-    if from_date:
-        query += " AND date >= ?"
-        params.append(from_date)
-    if to_date:
-        query += " AND date <= ?"
-        params.append(to_date)
-    if category_id is not None:
-        query += " AND category_id = ?"
-        params.append(category_id)
-    if user_id is not None:
-        query += " AND user_id = ?"
-        params.append(user_id)
-    
-    query += " ORDER BY date DESC, id DESC"
-    rows = db_conn.execute(query, params).fetchall()
-    return [schemas.Transaction(**dict(row)) for row in rows]
+) -> Response:
+    """Get transactions with optional filtering, newest first.
+
+    Paginated by keyset: pass the last row's ``date``/``id`` as
+    ``before_date``/``before_id`` to fetch the next page.
+
+    Rows come straight from our own schema, so the JSON body is built by SQLite
+    instead of going through response_model validation.
+
+    Responses carry an ETag; a matching If-None-Match gets 304 without running the query.
+    """
+    if (before_date is None) != (before_id is None):
+        raise HTTPException(status_code=400, detail="before_date and before_id must be given together")
+    etag = _transactions_etag(db_conn, request)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=cache_headers)
+    params = {
+        "from_date": from_date or None,
+        "to_date": to_date or None,
+        "category_id": category_id,
+        "user_id": user_id,
+        "before_date": before_date,
+        "before_id": before_id,
+        "limit": limit,
+    }
+    body = db_conn.execute(_LIST_TRANSACTIONS_SQL, params).fetchone()[0]
+    return Response(content=body, media_type="application/json", headers=cache_headers)
+
+_INSERT_TRANSACTION_SQL = (
+    "INSERT INTO transactions (date, amount, category_id, user_id, account_id, notes, tags, recurrence_id, period_key) "
+    "VALUES (?, CASE WHEN ? IN (SELECT id FROM categories WHERE name IN (?, ?)) THEN ABS(?) ELSE -ABS(?) END, "
+    f"?, ?, ?, ?, ?, ?, ?) RETURNING {_TX_COLUMNS_SQL}"
+)
 
 @router.post("", response_model=schemas.Transaction)
-async def api_create_transaction(
+def api_create_transaction(
     tr: schemas.TransactionCreate,
     db_conn: sqlite3.Connection = Depends(get_db_conn),
 ) -> schemas.Transaction:
     """Create a new transaction (expense)."""
-    # Determine sign by category (income categories stay positive)
-    is_income = _is_income_category(db_conn, tr.category_id)
-    amount = abs(tr.amount) if is_income else -abs(tr.amount)
+    # Sign is applied by SQLite from the category (income categories stay positive),
+    # so the statement and its parameter shape are the same for every insert.
+    row = db_conn.execute(_INSERT_TRANSACTION_SQL, (
+        tr.date,
+        tr.category_id,
+        *INCOME_CATEGORY_NAMES,
+        tr.amount,
+        tr.amount,
+        tr.category_id,
+        tr.user_id,
+        tr.account_id,
+        tr.notes,
+        tr.tags,
+        tr.recurrence_id,
+        tr.period_key,
+    )).fetchone()
+    db_conn.commit()
     
-    cur = db_conn.execute(
-        "INSERT INTO transactions (date, amount, category_id, user_id, account_id, notes, tags, recurrence_id, period_key) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    # Clear cache when new transaction is added
+    cache_service.mark_dirty("top_expenses_3months")
+    cache_service.mark_dirty("statistics_matrix")
+    
+    # Return the row as stored (with the signed amount)
+    return schemas.Transaction.from_row(row, _TX_COLS)
+
+@router.post("/bulk")
+def api_bulk_create_transactions(
+    items: List[schemas.TransactionCreate],
+    db_conn: sqlite3.Connection = Depends(get_db_conn),
+) -> JSONResponse:
+    """Create many transactions in a single SQLite transaction (one commit for the batch)."""
+    if not items:
+        raise HTTPException(status_code=400, detail="No transactions to create")
+    income_ids = _income_category_ids(db_conn)
+    rows = [
         (
             tr.date,
-            amount,
+            abs(tr.amount) if tr.category_id in income_ids else -abs(tr.amount),
             tr.category_id,
             tr.user_id,
             tr.account_id,
@@ -82,58 +171,79 @@ async def api_create_transaction(
             tr.tags,
             tr.recurrence_id,
             tr.period_key,
-        ),
+        )
+        for tr in items
+    ]
+    db_conn.executemany(
+        "INSERT INTO transactions (date, amount, category_id, user_id, account_id, notes, tags, recurrence_id, period_key) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
     )
     db_conn.commit()
-    new_id = cur.lastrowid
     
-    # Clear cache when new transaction is added
-    cache_service.invalidate("top_expenses_3months")
+    cache_service.mark_dirty("top_expenses_3months")
+    cache_service.mark_dirty("statistics_matrix")
     
-    # Return with the negative amount
-    tr_dict = tr.dict()
-    tr_dict['amount'] = amount
-    return schemas.Transaction(id=new_id, **tr_dict)
+    return JSONResponse(content={"created": len(rows)})
+
+@functools.lru_cache(maxsize=256)
+def _update_sql(names: Tuple[str, ...], signed_amount: bool, income_count: int) -> str:
+    """UPDATE statement for a given set of columns.
+
+    The same column set always yields the identical string, so sqlite3's
+    statement cache can reuse the prepared statement across requests.
+    """
+    set_parts = [f"{k} = ?" for k in names]
+    if signed_amount:
+        placeholders = ", ".join("?" * income_count)
+        set_parts.append(f"amount = CASE WHEN category_id IN ({placeholders}) THEN ? ELSE ? END")
+    return f"UPDATE transactions SET {', '.join(set_parts)} WHERE id = ? AND recurrence_id IS NULL RETURNING {_TX_COLUMNS_SQL}"
 
 @router.put("/{tx_id}", response_model=schemas.Transaction)
-async def api_update_transaction(
+def api_update_transaction(
     tx_id: int,
     update: schemas.TransactionUpdate,
     db_conn: sqlite3.Connection = Depends(get_db_conn),
 ) -> schemas.Transaction:
     """Update an existing transaction."""
-    fields = update.dict(exclude_unset=True)
+    names = sorted(update.model_fields_set)
+    fields = {n: getattr(update, n) for n in names}
     
-    # If amount is being updated, preserve sign according to (new or existing) category
+    # If amount is being updated, preserve sign according to (new or existing) category.
+    # When the category is not changing, the stored category decides the sign; let
+    # SQLite evaluate that inside the UPDATE instead of reading the row first.
+    abs_amount: Optional[float] = None
     if 'amount' in fields:
-        # Determine the effective category for sign
-        effective_category_id: Optional[int]
-        if 'category_id' in fields and fields['category_id'] is not None:
-            effective_category_id = fields['category_id']
+        if fields.get('category_id') is not None:
+            is_income = _is_income_category(db_conn, fields['category_id'])
+            fields['amount'] = abs(fields['amount']) if is_income else -abs(fields['amount'])
         else:
-            row = db_conn.execute("SELECT category_id FROM transactions WHERE id = ?", (tx_id,)).fetchone()
-            effective_category_id = row[0] if row else None
-        is_income = _is_income_category(db_conn, effective_category_id)
-        fields['amount'] = abs(fields['amount']) if is_income else -abs(fields['amount'])
+            abs_amount = abs(fields.pop('amount'))
     
-    if not fields:
+    if not fields and abs_amount is None:
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    set_clause = ", ".join([f"{k} = ?" for k in fields.keys()])
-    params = list(fields.values()) + [tx_id]
-    db_conn.execute(f"UPDATE transactions SET {set_clause} WHERE id = ? AND recurrence_id IS NULL", params)
+    params = list(fields.values())
+    income_count = 0
+    if abs_amount is not None:
+        income_ids = sorted(_income_category_ids(db_conn))
+        income_count = len(income_ids)
+        params.extend(income_ids + [abs_amount, -abs_amount])
+    params.append(tx_id)
+    # RETURNING hands back the row as written, so no follow-up SELECT is needed
+    row = db_conn.execute(_update_sql(tuple(fields), abs_amount is not None, income_count), params).fetchone()
     db_conn.commit()
     
     # Clear cache when transaction is updated
-    cache_service.invalidate("top_expenses_3months")
+    cache_service.mark_dirty("top_expenses_3months")
+    cache_service.mark_dirty("statistics_matrix")
     
-    row = db_conn.execute("SELECT * FROM transactions WHERE id = ? AND recurrence_id IS NULL", (tx_id,)).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return schemas.Transaction(**dict(row))
+    return schemas.Transaction.from_row(row, _TX_COLS)
 
 @router.delete("/{tx_id}")
-async def api_delete_transaction(
+def api_delete_transaction(
     tx_id: int,
     db_conn: sqlite3.Connection = Depends(get_db_conn),
 ) -> JSONResponse:
@@ -154,43 +264,58 @@ async def api_delete_transaction(
     db_conn.commit()
     
     # Clear cache when transaction is deleted
-    cache_service.invalidate("top_expenses_3months")
+    cache_service.mark_dirty("top_expenses_3months")
+    cache_service.mark_dirty("statistics_matrix")
     
     return JSONResponse(content={"deleted": True})
 
 @router.post("/{tx_id}/duplicate")
-async def api_duplicate_transaction(
+def api_duplicate_transaction(
     tx_id: int,
     db_conn: sqlite3.Connection = Depends(get_db_conn),
 ) -> JSONResponse:
     """Duplicate a transaction by id and return the new id."""
-    row = db_conn.execute(
+    cur = db_conn.execute(
+        "INSERT INTO transactions (date, amount, category_id, user_id, account_id, notes, tags) "
         "SELECT date, amount, category_id, user_id, account_id, notes, tags "
         "FROM transactions WHERE id = ? AND recurrence_id IS NULL",
         (tx_id,),
-    ).fetchone()
-    if not row:
-        raise HTTPException(status_code=404, detail="Transaction not found")
-    cur = db_conn.execute(
-        "INSERT INTO transactions (date, amount, category_id, user_id, account_id, notes, tags) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (
-            row["date"],
-            row["amount"],
-            row["category_id"],
-            row["user_id"],
-            row["account_id"],
-            row["notes"],
-            row["tags"],
-        ),
     )
+    if cur.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Transaction not found")
     db_conn.commit()
     new_id = cur.lastrowid
-    cache_service.invalidate("top_expenses_3months")
+    cache_service.mark_dirty("top_expenses_3months")
+    cache_service.mark_dirty("statistics_matrix")
     return JSONResponse(content={"duplicated": True, "id": new_id})
 
+_EXPORT_BATCH_SIZE = 2000
+_EXPORT_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+
+def _iter_file(fh, chunk_size: int = 64 * 1024):
+    """Yield a file's content in chunks and close it when done."""
+    try:
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fh.close()
+
+def _has_tags_fts(db_conn: sqlite3.Connection) -> bool:
+    """True if initialise_database managed to create the tags FTS5 index."""
+    return db_conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='transactions_tags_fts'"
+    ).fetchone() is not None
+
+def _tags_match_query(tag_list: List[str]) -> str:
+    """FTS5 MATCH expression matching any of the tags (each quoted as a phrase)."""
+    return " OR ".join('"' + tg.replace('"', '""') + '"' for tg in tag_list)
+
 @router.get("/export")
-async def api_export_transactions(
+def api_export_transactions(
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
     category_id: Optional[int] = None,
@@ -231,7 +356,11 @@ async def api_export_transactions(
         params.append(abs(amount_max))
     if tags and tags.strip():
         tag_list = [tg.strip() for tg in tags.split(',') if tg.strip()]
-        if tag_list:
+        if tag_list and _has_tags_fts(db_conn):
+            where_clause += " AND t.id IN (SELECT rowid FROM transactions_tags_fts WHERE transactions_tags_fts MATCH ?)"
+            params.append(_tags_match_query(tag_list))
+        elif tag_list:
+            # SQLite built without FTS5: substring scan per tag
             where_clause += " AND (" + " OR ".join(["t.tags LIKE ?"] * len(tag_list)) + ")"
             params.extend([f"%{tg}%" for tg in tag_list])
 
@@ -255,35 +384,42 @@ async def api_export_transactions(
         {where_clause}
         {order_clause}
     """
-    rows = db_conn.execute(query, params).fetchall()
+    cursor = db_conn.execute(query, params)
+
+    # openpyxl is heavy; only pay its import cost when an export is requested
+    from openpyxl import Workbook
 
-    # Build workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Transactions"
+    # Build workbook in write-only mode: rows are serialized as they are appended
+    # instead of being kept as cell objects, so memory stays flat for big exports.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Transactions")
     headers = [
         "ID", "Date", "Amount", "Category", "User", "Account", "Notes", "Tags"
     ]
     ws.append(headers)
-    for r in rows:
-        ws.append([
-            r["id"],
-            r["date"],
-            float(r["amount"] or 0),
-            r["category"],
-            r["user"],
-            r["account"],
-            r["notes"],
-            r["tags"],
-        ])
-
-    # Stream response
-    bio = BytesIO()
-    wb.save(bio)
-    bio.seek(0)
+    while True:
+        batch = cursor.fetchmany(_EXPORT_BATCH_SIZE)
+        if not batch:
+            break
+        for r in batch:
+            ws.append([
+                r["id"],
+                r["date"],
+                float(r["amount"] or 0),
+                r["category"],
+                r["user"],
+                r["account"],
+                r["notes"],
+                r["tags"],
+            ])
+
+    # Stream response; large files spill from memory to a temp file
+    out = tempfile.SpooledTemporaryFile(max_size=_EXPORT_SPOOL_MAX_BYTES)
+    wb.save(out)
+    out.seek(0)
     filename = "transactions_export.xlsx"
     return StreamingResponse(
-        bio,
+        _iter_file(out),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
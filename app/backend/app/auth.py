@@ -1,4 +1,4 @@
-from typing import Any, Callable, List, Tuple, Set
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List
 import re
 import logging
 
@@ -21,30 +21,62 @@ def is_endpoint_public(endpoint: Any) -> bool:
         return False
 
 
-def build_public_route_matchers(app: Any) -> List[Tuple["re.Pattern[str]", Set[str]]]:
-    """Collect regex + methods for routes decorated with @public.
+# Named groups from different routes would clash once joined into one pattern
+_NAMED_GROUP_RE = re.compile(r"\(\?P<[^>]+>")
 
-    Returns list of tuples: (compiled_regex, set_of_methods)
+
+def _iter_public_routes(app: Any) -> Iterator[Any]:
+    """Yield the app's APIRoutes whose endpoint is decorated with @public."""
+    for r in getattr(app, "routes", []) or []:
+        try:
+            is_public = isinstance(r, APIRoute) and is_endpoint_public(getattr(r, "endpoint", None))
+        except Exception:
+            is_public = False
+        if is_public:
+            yield r
+
+
+def build_public_route_matchers(app: Any) -> Dict[str, "re.Pattern[str]"]:
+    """Collect routes decorated with @public into one combined regex per HTTP method.
+
+    Returns dict: method -> compiled alternation of that method's public path regexes,
+    so the auth middleware does a single match per request regardless of route count.
     """
     logger = logging.getLogger(__name__)
-    matchers: List[Tuple["re.Pattern[str]", Set[str]]] = []
+    by_method: Dict[str, List[str]] = {}
     try:
-        for r in getattr(app, "routes", []) or []:
-            try:
-                is_public = isinstance(r, APIRoute) and is_endpoint_public(getattr(r, "endpoint", None))
-            except Exception:
-                is_public = False
-            if not is_public:
-                continue
+        for r in _iter_public_routes(app):
             try:
-                regex = getattr(r, "path_regex")
+                pattern = getattr(r, "path_regex").pattern
             except Exception:
                 path_str = getattr(r, "path", getattr(r, "path_format", "")) or ""
                 pattern = "^" + re.escape(path_str) + "$"
-                regex = re.compile(pattern)
-            methods = set(m.upper() for m in (getattr(r, "methods", None) or {"GET"}))
-            matchers.append((regex, methods))
+            pattern = _NAMED_GROUP_RE.sub("(?:", pattern)
+            for m in (getattr(r, "methods", None) or {"GET"}):
+                by_method.setdefault(m.upper(), []).append(pattern)
     except Exception:
         logger.exception("Failed building public route matchers")
-    return matchers
+    return {
+        m: re.compile("|".join(f"(?:{p})" for p in patterns))
+        for m, patterns in by_method.items()
+    }
 
+
+def build_public_static_paths(app: Any) -> Dict[str, FrozenSet[str]]:
+    """Map each parameter-free @public path to the HTTP methods it allows.
+
+    Lets the auth middleware settle exact paths like /login with one dict lookup
+    before falling back to the combined regex for parameterized routes.
+    """
+    logger = logging.getLogger(__name__)
+    by_path: Dict[str, set] = {}
+    try:
+        for r in _iter_public_routes(app):
+            path = getattr(r, "path", "") or ""
+            if not path or "{" in path:
+                continue
+            methods = {m.upper() for m in (getattr(r, "methods", None) or {"GET"})}
+            by_path.setdefault(path, set()).update(methods)
+    except Exception:
+        logger.exception("Failed building public static paths")
+    return {path: frozenset(methods) for path, methods in by_path.items()}
@@ -4,22 +4,55 @@ Database connection and initialization helpers.
 This file is the single source of truth for opening the SQLite connection.
 """
 
+import calendar
+import logging
 import sqlite3
 import os
+import queue
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Iterator
 from datetime import date, timedelta
 
+from .services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
 # מיקום ברירת מחדל של מסד הנתונים (תעדכן אם שינית את השם/נתיב)
 # ניתן לעקוף באמצעות משתנה סביבה BUDGET_DB_PATH כדי להריץ בדיקות על עותק זמני ובטוח
 _DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "budget.db"
 DB_PATH = Path(os.environ.get("BUDGET_DB_PATH", str(_DEFAULT_DB_PATH)))
 
 
+# sqlite3 keeps an LRU of prepared statements per connection, keyed by SQL text.
+# Handlers use fixed SQL strings, so a larger cache means repeated queries skip
+# SQLite's parse/plan step instead of being evicted.
+_STATEMENT_CACHE_SIZE = 256
+
+# How long a writer waits for a competing write lock before giving up
+_BUSY_TIMEOUT_SECONDS = 30.0
+
+# Set once the DB file has been switched to WAL (a persistent setting)
+_wal_configured = False
+
+
+# Default rows seeded into empty lookup tables by initialise_database()
+DEFAULT_CATEGORIES = (
+    ("משכורת", 0), ("קליניקה", 0), ("בריאות", 0), ("חסכונות", 1),
+    ("פנאי", 0), ("הוצאות בית", 0), ("רכב", 0), ("תחבורה", 0), ("אוכל בחוץ", 0),
+)
+DEFAULT_USERS = (("Yosef",), ("Karina",))
+DEFAULT_ACCOUNTS = (("מזומן",), ("כרטיס אשראי",))
+
+
 def get_connection() -> sqlite3.Connection:
     conn = sqlite3.connect(
         str(DB_PATH),
         check_same_thread=False,  # <— הוספה חשובה
+        # Wait (sets busy_timeout) instead of failing with "database is locked"
+        # when another request holds the write lock
+        timeout=_BUSY_TIMEOUT_SECONDS,
+        cached_statements=_STATEMENT_CACHE_SIZE,
     )
     conn.row_factory = sqlite3.Row
     # Enforce declared ON DELETE CASCADE rules (SQLite is off by default per-connection)
@@ -27,18 +60,94 @@ def get_connection() -> sqlite3.Connection:
         conn.execute("PRAGMA foreign_keys = ON")
     except sqlite3.Error:
         pass
+    # WAL lets readers run alongside a writer; with WAL, synchronous=NORMAL only
+    # syncs at checkpoints instead of on every commit. cache_size is in KiB (~64MB).
+    # journal_mode is stored in the DB file, so it is only switched once per process.
+    global _wal_configured
+    try:
+        if not _wal_configured and str(DB_PATH) != ":memory:":
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            # Only remember success; e.g. a read-only file keeps its old mode
+            _wal_configured = str(mode).lower() == "wal"
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -64000")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA mmap_size = 268435456")
+    except sqlite3.Error:
+        pass
     return conn
 
 
+# Request connections are reused instead of reopened: a pooled connection keeps
+# its page cache, PRAGMAs and prepared statements warm across requests. Each
+# request still gets exclusive use of its connection, so transactions don't mix.
+_POOL_SIZE = 8
+_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=_POOL_SIZE)
+
+
+def _acquire_connection() -> sqlite3.Connection:
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        return get_connection()
+
+
+def _release_connection(conn: sqlite3.Connection) -> None:
+    try:
+        # Never hand the next request a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        _pool.put_nowait(conn)
+    except (sqlite3.Error, queue.Full):
+        conn.close()
+
+
+def close_pooled_connections() -> None:
+    """Close idle pooled connections (on shutdown the last close checkpoints the WAL)."""
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+@contextmanager
+def pooled_connection() -> Iterator[sqlite3.Connection]:
+    """Borrow a connection from the pool for the duration of the block."""
+    conn = _acquire_connection()
+    try:
+        yield conn
+    finally:
+        _release_connection(conn)
+
+
 def get_db_conn() -> Generator[sqlite3.Connection, None, None]:
     """
-    Dependency for FastAPI to get database connection.
+    Dependency for FastAPI to get database connection (borrowed from the pool).
     """
-    conn = get_connection()
+    with pooled_connection() as conn:
+        yield conn
+
+
+@contextmanager
+def bulk(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Run a batch of writes as one transaction (one commit/fsync for the batch).
+
+    BEGIN IMMEDIATE takes the write lock up front, so reads made inside the
+    block can't be invalidated by another writer before our own writes land.
+    """
+    conn.execute("BEGIN IMMEDIATE")
     try:
         yield conn
-    finally:
-        conn.close()
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
 
 
 def get_db_path() -> str:
@@ -70,6 +179,7 @@ def _reset_database_if_requested() -> None:
     try:
         cur.execute("PRAGMA foreign_keys = OFF;")
         for tbl in [
+            "transactions_tags_fts",
             "transactions",
             "recurrence_skips",
             "recurrences",
@@ -77,6 +187,7 @@ def _reset_database_if_requested() -> None:
             "users",
             "categories",
             "system_settings",
+            "table_versions",
         ]:
             try:
                 cur.execute(f"DROP TABLE IF EXISTS {tbl}")
@@ -92,6 +203,10 @@ def initialise_database() -> None:
     
     cur = conn.cursor()
 
+    # Create the core schema in one transaction: sqlite3 runs DDL in autocommit
+    # mode otherwise, paying a journal sync for every CREATE statement.
+    cur.execute("BEGIN")
+
     # Create tables
     cur.execute("""
         CREATE TABLE IF NOT EXISTS categories (
@@ -174,25 +289,84 @@ def initialise_database() -> None:
         )
     """)
 
+    # Indexes for the transaction list/statistics queries. idx_tx_hot serves the
+    # "recurrence_id IS NULL ORDER BY date DESC, id DESC" shape as an equality seek
+    # followed by an ordered scan, so no temp b-tree sort is needed.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tx_hot ON transactions (recurrence_id, date DESC, id DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tx_category_date ON transactions (category_id, date DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tx_user_date ON transactions (user_id, date DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tx_date ON transactions (date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tx_account ON transactions (account_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_rec_active_user ON recurrences (active, user_id)")
+
+    # Full-text index over transaction tags (external content, kept in sync by
+    # triggers). The tokenizer splits the comma-separated list, so tag filters
+    # become an index lookup instead of a LIKE '%tag%' scan per tag.
+    try:
+        fts_exists = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='transactions_tags_fts'"
+        ).fetchone()
+        if not fts_exists:
+            cur.execute(
+                "CREATE VIRTUAL TABLE transactions_tags_fts USING fts5("
+                "tags, content='transactions', content_rowid='id')"
+            )
+            cur.execute("INSERT INTO transactions_tags_fts (transactions_tags_fts) VALUES ('rebuild')")
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS transactions_tags_ai AFTER INSERT ON transactions BEGIN
+                INSERT INTO transactions_tags_fts (rowid, tags) VALUES (new.id, new.tags);
+            END
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS transactions_tags_ad AFTER DELETE ON transactions BEGIN
+                INSERT INTO transactions_tags_fts (transactions_tags_fts, rowid, tags) VALUES ('delete', old.id, old.tags);
+            END
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS transactions_tags_au AFTER UPDATE OF tags ON transactions BEGIN
+                INSERT INTO transactions_tags_fts (transactions_tags_fts, rowid, tags) VALUES ('delete', old.id, old.tags);
+                INSERT INTO transactions_tags_fts (rowid, tags) VALUES (new.id, new.tags);
+            END
+        """)
+    except sqlite3.Error:
+        # Best-effort like the migrations below; export falls back to LIKE without it
+        logger.warning("Could not create transactions_tags_fts; tag filters will scan", exc_info=True)
+
+    # Change counter for the transactions table, bumped by triggers so every writer
+    # (API, partials, recurrence jobs, restores) is covered. Used for HTTP ETags.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cur.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES ('transactions', 0)")
+    for _event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS transactions_version_{_event.lower()} AFTER {_event} ON transactions BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE name = 'transactions';
+            END
+        """)
+
+    conn.commit()
+
     # --- Migrations ---
     # 1) Ensure recurrences table has next_charge_date. If missing (legacy schema), add and populate.
     try:
-        cols = [r[1] for r in cur.execute("PRAGMA table_info('recurrences')").fetchall()]
+        cols = {r[1] for r in cur.execute("PRAGMA table_info('recurrences')").fetchall()}
         if "next_charge_date" not in cols:
             cur.execute("ALTER TABLE recurrences ADD COLUMN next_charge_date TEXT")
+            cols.add("next_charge_date")
             # Populate next_charge_date for existing rows based on frequency/day_of_month/weekday and today
+            # Dates stay date objects until they are bound to the UPDATE
             today = date.today()
 
-            def clamp_day(year: int, month: int, day: int) -> str:
-                import calendar
+            def clamp_day(year: int, month: int, day: int) -> date:
                 last = calendar.monthrange(year, month)[1]
-                if day < 1:
-                    day = 1
-                if day > last:
-                    day = last
-                return f"{year:04d}-{month:02d}-{day:02d}"
+                return date(year, month, min(max(day, 1), last))
 
             rows = cur.execute("SELECT id, frequency, day_of_month, weekday, start_date FROM recurrences").fetchall()
+            updates = []
             for r in rows:
                 freq = r[1]
                 dom = r[2]
@@ -204,7 +378,7 @@ def initialise_database() -> None:
                     day = int(dom) if dom is not None else 1
                     y, m = today.year, today.month
                     tentative = clamp_day(y, m, day)
-                    if tentative < today.isoformat():
+                    if tentative < today:
                         # move to next month
                         if m == 12:
                             y, m = y + 1, 1
@@ -222,34 +396,32 @@ def initialise_database() -> None:
                         next_dt = today
                     else:
                         next_dt = today + timedelta(days=delta)
-                    next_date = next_dt.isoformat()
+                    next_date = next_dt
                 elif freq == "yearly":
                     # Use start_date if exists; otherwise default Aug 1st
+                    mm, dd = 8, 1
                     if start_date_val:
                         try:
                             mm = int(start_date_val.split("-")[1])
                             dd = int(start_date_val.split("-")[2])
+                            clamp_day(today.year, mm, dd)  # validates the month
                         except Exception:
                             mm, dd = 8, 1
-                    else:
-                        mm, dd = 8, 1
-                    y = today.year
-                    candidate = f"{y:04d}-{mm:02d}-{dd:02d}"
-                    if candidate < today.isoformat():
-                        candidate = f"{y+1:04d}-{mm:02d}-{dd:02d}"
-                    next_date = candidate
+                    # Clamped, so Feb 29 falls back to Feb 28 in non-leap years
+                    next_date = clamp_day(today.year, mm, dd)
+                    if next_date < today:
+                        next_date = clamp_day(today.year + 1, mm, dd)
                 else:
                     # Fallback: schedule for tomorrow
-                    next_date = (today + timedelta(days=1)).isoformat()
+                    next_date = today + timedelta(days=1)
 
-                cur.execute(
-                    "UPDATE recurrences SET next_charge_date = ? WHERE id = ?",
-                    (next_date, r[0]),
-                )
-        # 2) Ensure recurrences has account_id column (nullable FK)
-        cols = [r[1] for r in cur.execute("PRAGMA table_info('recurrences')").fetchall()]
+                updates.append((next_date.isoformat(), r[0]))
+
+            cur.executemany("UPDATE recurrences SET next_charge_date = ? WHERE id = ?", updates)
+        # 2) Ensure recurrences has account_id column (nullable FK); reuses the column set above
         if "account_id" not in cols:
             cur.execute("ALTER TABLE recurrences ADD COLUMN account_id INTEGER")
+            cols.add("account_id")
     except Exception:
         # Migration best-effort; do not fail app startup
         pass
@@ -303,22 +475,17 @@ def initialise_database() -> None:
         # Do not fail startup for normalization; safe to continue
         pass
 
-    # Insert default data if tables are empty
-    if not cur.execute("SELECT COUNT(*) FROM categories").fetchone()[0]:
-        for _cat, _is_saving in [
-            ("משכורת", 0), ("קליניקה", 0), ("בריאות", 0), ("חסכונות", 1),
-            ("פנאי", 0), ("הוצאות בית", 0), ("רכב", 0), ("תחבורה", 0), ("אוכל בחוץ", 0),
-        ]:
-            cur.execute("INSERT INTO categories (name, is_saving) VALUES (?, ?)", (_cat, _is_saving))
+    # Insert default data if tables are empty. Only emptiness is checked (EXISTS
+    # stops at the first row); INSERT OR IGNORE would re-add defaults users deleted.
+    if not cur.execute("SELECT EXISTS (SELECT 1 FROM categories)").fetchone()[0]:
+        cur.executemany("INSERT OR IGNORE INTO categories (name, is_saving) VALUES (?, ?)", DEFAULT_CATEGORIES)
 
-    if not cur.execute("SELECT COUNT(*) FROM users").fetchone()[0]:
+    if not cur.execute("SELECT EXISTS (SELECT 1 FROM users)").fetchone()[0]:
         # Seed only the real users (English canonical names)
-        cur.execute("INSERT INTO users (name) VALUES ('Yosef')")
-        cur.execute("INSERT INTO users (name) VALUES ('Karina')")
+        cur.executemany("INSERT OR IGNORE INTO users (name) VALUES (?)", DEFAULT_USERS)
 
-    if not cur.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]:
-        cur.execute("INSERT INTO accounts (name) VALUES ('מזומן')")
-        cur.execute("INSERT INTO accounts (name) VALUES ('כרטיס אשראי')")
+    if not cur.execute("SELECT EXISTS (SELECT 1 FROM accounts)").fetchone()[0]:
+        cur.executemany("INSERT OR IGNORE INTO accounts (name) VALUES (?)", DEFAULT_ACCOUNTS)
 
 
 
@@ -620,11 +787,10 @@ def initialise_database() -> None:
             cur.execute("DELETE FROM wedding_rooms")
             existing_names = set()
         if not existing_names:
-            for name, room_type, capacity in default_rooms:
-                cur.execute(
-                    "INSERT INTO wedding_rooms (name, room_type, max_capacity) VALUES (?,?,?)",
-                    (name, room_type, capacity)
-                )
+            cur.executemany(
+                "INSERT INTO wedding_rooms (name, room_type, max_capacity) VALUES (?,?,?)",
+                default_rooms,
+            )
         conn.commit()
     except Exception:
         pass
@@ -645,5 +811,20 @@ def initialise_database() -> None:
     """)
 
     conn.commit()
+
+    # Give the planner statistics for the indexes above: a full ANALYZE the first
+    # time, afterwards PRAGMA optimize only re-analyzes tables that need it.
+    try:
+        has_stats = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'"
+        ).fetchone()
+        cur.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+        conn.commit()
+    except sqlite3.Error:
+        pass
     conn.close()
 
+    # Lookup rows may have been seeded or renamed above; drop the cached copies.
+    cache_service.invalidate("income_category_ids")
+    cache_service.invalidate("page_lookups:expense")
+    cache_service.invalidate("page_lookups:income")
@@ -1,22 +1,36 @@
 # --- imports ---
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path as FSPath
 import os
 import logging
+from anyio import to_thread
 from urllib.parse import quote_plus
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 # --- create app ---
-app = FastAPI(title="Expense Tracker", version="0.2.0")
+app = FastAPI(title="Expense Tracker", version="0.2.0", default_response_class=ORJSONResponse)
+
+# JSON lists (transactions, statistics, recurrences) compress well; tiny bodies
+# like /health or redirects are left alone by minimum_size.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # --- static (מצביעים ל-frontend) ---
 ROOT_DIR = FSPath(__file__).resolve().parents[2]   # .../expense_tracker/app
 FRONTEND_DIR = ROOT_DIR / "frontend"
 STATIC_DIR = FRONTEND_DIR / "static"
 if STATIC_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    # Existence was just checked; skip StaticFiles' own directory check
+    app.mount("/static", StaticFiles(directory=str(STATIC_DIR), check_dir=False), name="static")
+
+
+def _envbool(name: str, default: str = "0") -> bool:
+    """Parse a boolean env var ("1", "true", "yes", "on"; case-insensitive)."""
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
 
 # --- sessions ---
 # SESSION_SECRET_KEY must be provided via env var. Never hardcode a fallback —
@@ -46,11 +60,7 @@ else:
     if COOKIE_SAMESITE not in {"lax", "strict", "none"}:
         COOKIE_SAMESITE = "lax"
     
-    _secure_env = os.environ.get("COOKIE_SECURE")
-    if _secure_env is not None:
-        HTTPS_ONLY = str(_secure_env).strip().lower() in {"1", "true", "yes", "on"}
-    else:
-        HTTPS_ONLY = False  # Default to False for local development
+    HTTPS_ONLY = _envbool("COOKIE_SECURE")  # Default to False for local development
     
     SESSION_COOKIE_DOMAIN = os.environ.get("SESSION_COOKIE_DOMAIN")
 
@@ -94,15 +104,18 @@ except Exception as e:
     # Fallback with minimal configuration
     app.add_middleware(SessionMiddleware, secret_key=SESSION_SECRET_KEY)
 
-from .services.logging_service import configure_logging, redirect_prints_to_logs
+from .services.logging_service import (
+    configure_logging,
+    redirect_prints_to_logs,
+    start_log_listeners,
+    stop_log_listeners,
+)
 from .services.production_logging import setup_production_logging, log_environment_info
 
 # --- logging (writes tracebacks to logs/server.log) ---
 LOG_DIR = ROOT_DIR / "logs"
 
-# Check if we're in production (Railway deployment)
-is_production = os.environ.get("RAILWAY_ENVIRONMENT") is not None or os.environ.get("ENVIRONMENT") == "production"
-
+# is_production was read from the environment once, above
 if is_production:
     setup_production_logging(LOG_DIR)
     log_environment_info()
@@ -117,7 +130,7 @@ print_handler.__enter__()
 
 from fastapi.responses import JSONResponse, RedirectResponse
 from . import db
-from .auth import public, build_public_route_matchers
+from .auth import public, build_public_route_matchers, build_public_static_paths
 from .services.cron_service import CronService
 from .services.auth_middleware import AuthMiddleware
 
@@ -126,6 +139,7 @@ from .routes.pages import router as pages_router
 from .routes.partials import router as partials_router
 from .routes.debug_logs import router as debug_logs_router
 from .routes.workouts import router as workouts_router
+from .routes.templating import warm_templates
 from .api.transactions import router as transactions_api
 from .api.recurrences import router as recurrences_api, system_router as system_api
 from .api.backup import router as backup_api
@@ -146,15 +160,20 @@ app.include_router(wedding_api)
 
 # Build public route matchers from routes decorated with @public
 PUBLIC_ROUTE_MATCHERS = build_public_route_matchers(app)
+PUBLIC_STATIC_PATHS = build_public_static_paths(app)
 
 # --- auth middleware (must be added AFTER session middleware) ---
 auth_enabled_env = os.environ.get("AUTH_ENABLED", "1")
-running_pytest = os.environ.get("PYTEST_CURRENT_TEST") is not None
 # Allow disabling auth only under pytest
-auth_enabled = not (auth_enabled_env != "1" and running_pytest)
+auth_enabled = not (auth_enabled_env != "1" and _running_pytest)
 
 # Add AuthMiddleware - this must be after SessionMiddleware
-app.add_middleware(AuthMiddleware, public_route_matchers=PUBLIC_ROUTE_MATCHERS, auth_enabled=auth_enabled)
+app.add_middleware(
+    AuthMiddleware,
+    public_route_matchers=PUBLIC_ROUTE_MATCHERS,
+    public_static_paths=PUBLIC_STATIC_PATHS,
+    auth_enabled=auth_enabled,
+)
 
 # Redirect root to expenses if needed (handled in pages router too)
 @app.get("/health")
@@ -163,14 +182,32 @@ async def health():
     return {"status": "ok"}
 
 
+# Sync (def) handlers run in anyio's worker pool; its default of 40 threads caps
+# concurrent SQLite-backed requests well below what the box can serve.
+THREADPOOL_SIZE = 200
+
+
 # --- lifecycle: init DB and start/stop cron ---
 @app.on_event("startup")
 async def _on_startup() -> None:
+    # A previous shutdown in this process may have stopped the log writers
+    start_log_listeners()
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     try:
         db.initialise_database()
     except Exception:
         logger.exception("Database initialization failed")
         # Keep starting the app; routes like backup may help diagnose
+    # Pay template compilation and the first pooled connect before any user does
+    try:
+        warm_templates()
+    except Exception:
+        logger.exception("Template warm-up failed")
+    try:
+        with db.pooled_connection() as conn:
+            conn.execute("SELECT 1")
+    except Exception:
+        logger.exception("DB pool warm-up failed")
     try:
         cron = CronService()
         cron.start()
@@ -187,6 +224,8 @@ async def _on_shutdown() -> None:
             cron.stop()
         except Exception:
             logger.exception("CronService shutdown error")
+    db.close_pooled_connections()
+    stop_log_listeners()
 
 
 # (Old function-based auth middleware removed in favor of class-based one above)
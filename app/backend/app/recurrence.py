@@ -13,6 +13,7 @@ period_key)` unique constraint on the `transactions` table.
 from __future__ import annotations
 
 import calendar
+from functools import lru_cache
 from datetime import date, datetime, timedelta
 from typing import List, Tuple, Optional, Any
 
@@ -22,13 +23,21 @@ from . import db  # ניגש ישירות ל-db הקיים שלך (ללא servic
 # --------- Helpers: dates ---------
 
 def parse_date(ds: str) -> date:
-    return datetime.strptime(ds, "%Y-%m-%d").date()
+    try:
+        return date.fromisoformat(ds)
+    except ValueError:
+        # strptime also accepts non-padded dates like 2025-1-5
+        return datetime.strptime(ds, "%Y-%m-%d").date()
 
 def format_date(d: date) -> str:
     return d.isoformat()
 
+@lru_cache(maxsize=4096)
+def _days_in_month(year: int, month: int) -> int:
+    return calendar.monthrange(year, month)[1]
+
 def _clamp_day(year: int, month: int, day: int) -> date:
-    last_day = calendar.monthrange(year, month)[1]
+    last_day = _days_in_month(year, month)
     if day < 1:
         day = 1
     if day > last_day:
@@ -80,66 +89,68 @@ def apply_recurring(today: Optional[date] = None) -> int:
     if today is None:
         today = date.today()
 
-    count_inserted = 0
-    conn = db.get_connection()
-    try:
-        conn.execute("PRAGMA foreign_keys = ON")
-
-        rows = conn.execute(
-            "SELECT * FROM recurrences WHERE active = 1 AND next_charge_date IS NOT NULL"
-        ).fetchall()
-
-        for row in rows:
-            rec = dict(row)
-            try:
-                due = parse_date(rec["next_charge_date"]) if rec.get("next_charge_date") else None
-            except Exception:
-                due = None
-            if not due:
-                continue
-
-            # Loop while overdue (catch up if app was down)
-            while due <= today:
-                period_key = due.isoformat()
-
-                # Skip if explicitly marked as skipped
-                skipped = conn.execute(
-                    "SELECT 1 FROM recurrence_skips WHERE recurrence_id = ? AND period_key = ? LIMIT 1",
-                    (rec["id"], period_key),
-                ).fetchone()
-                if not skipped:
-                    # Idempotency: check if already exists
-                    exists = conn.execute(
-                        "SELECT 1 FROM transactions WHERE recurrence_id = ? AND period_key = ? LIMIT 1",
-                        (rec["id"], period_key),
-                    ).fetchone()
-                    if not exists:
-                        conn.execute(
-                            "INSERT INTO transactions (date, amount, category_id, user_id, account_id, notes, tags, recurrence_id, period_key) "
-                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                            (
-                                due.isoformat(),
-                                -abs(rec["amount"]),
-                                rec["category_id"],
-                                rec["user_id"],
-                                rec.get("account_id"),
-                                None,
-                                None,
-                                rec["id"],
-                                period_key,
-                            ),
-                        )
-                        count_inserted += 1
-
-                # Advance next charge date by one interval
-                next_due = _compute_next_charge_date(due, rec.get("frequency"), rec.get("day_of_month"), rec.get("weekday"))
-                conn.execute(
-                    "UPDATE recurrences SET next_charge_date = ? WHERE id = ?",
-                    (next_due.isoformat(), rec["id"]),
-                )
-                due = next_due
-
-        conn.commit()
-        return count_inserted
-    finally:
-        conn.close()
+    # Pooled like request connections, so cron and API runs don't reopen the file.
+    # One transaction for the whole catch-up, however many periods it inserts.
+    with db.pooled_connection() as conn, db.bulk(conn):
+        return _apply_due(conn, today)
+
+
+def _apply_due(conn: sqlite3.Connection, today: date) -> int:
+    """Insert every due occurrence and advance next_charge_date; caller commits."""
+    due_recs: List[Tuple[dict, date]] = []
+    for row in conn.execute(
+        "SELECT * FROM recurrences WHERE active = 1 AND next_charge_date IS NOT NULL"
+    ).fetchall():
+        rec = dict(row)
+        try:
+            due = parse_date(rec["next_charge_date"])
+        except Exception:
+            continue
+        if due <= today:
+            due_recs.append((rec, due))
+    if not due_recs:
+        return 0
+
+    # Period keys are ISO dates, so one query per table fetches every key that the
+    # catch-up below could produce, instead of two lookups per period.
+    ids = [rec["id"] for rec, _ in due_recs]
+    params = (*ids, min(due for _, due in due_recs).isoformat())
+    placeholders = ",".join("?" * len(ids))
+    due_keys_sql = (
+        "SELECT recurrence_id, period_key FROM {table} "
+        f"WHERE recurrence_id IN ({placeholders}) AND period_key >= ?"
+    )
+    skipped = {tuple(r) for r in conn.execute(due_keys_sql.format(table="recurrence_skips"), params)}
+    existing = {tuple(r) for r in conn.execute(due_keys_sql.format(table="transactions"), params)}
+
+    to_insert: List[Tuple[Any, ...]] = []
+    next_dates: List[Tuple[str, int]] = []
+    for rec, due in due_recs:
+        # Loop while overdue (catch up if app was down)
+        while due <= today:
+            period_key = due.isoformat()
+            key = (rec["id"], period_key)
+            # Skip if explicitly marked as skipped; idempotency: skip if already exists
+            if key not in skipped and key not in existing:
+                to_insert.append((
+                    period_key,
+                    -abs(rec["amount"]),
+                    rec["category_id"],
+                    rec["user_id"],
+                    rec.get("account_id"),
+                    None,
+                    None,
+                    rec["id"],
+                    period_key,
+                ))
+            # Advance next charge date by one interval
+            due = _compute_next_charge_date(due, rec.get("frequency"), rec.get("day_of_month"), rec.get("weekday"))
+        next_dates.append((due.isoformat(), rec["id"]))
+
+    conn.executemany(
+        "INSERT INTO transactions (date, amount, category_id, user_id, account_id, notes, tags, recurrence_id, period_key) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        to_insert,
+    )
+    conn.executemany("UPDATE recurrences SET next_charge_date = ? WHERE id = ?", next_dates)
+    return len(to_insert)
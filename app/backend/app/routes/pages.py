@@ -7,18 +7,18 @@ from collections import deque
 from threading import Lock
 from typing import Any, Deque, Dict, List, Optional
 from datetime import date, timedelta, datetime
-from pathlib import Path as FSPath
 import calendar
 
 from fastapi import APIRouter, Depends, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
 from itsdangerous import URLSafeSerializer
-from fastapi.templating import Jinja2Templates
 from ..auth import public
 from urllib.parse import unquote_plus
 
 from ..db import get_db_conn
 from .. import db as _db
+from ..services.cache_service import cache_service
+from .templating import FRONTEND_DIR, templates
 import logging
 logger = logging.getLogger(__name__)
 
@@ -72,12 +72,7 @@ def _get_session_secret() -> str:
     return secret
 
 # Frontend paths
-ROOT_DIR = FSPath(__file__).resolve().parents[3]
-FRONTEND_DIR = ROOT_DIR / "frontend"
-TEMPLATES_DIR = FRONTEND_DIR / "templates"
 STATIC_DIR = FRONTEND_DIR / "static"
-
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 router = APIRouter(tags=["pages"])
 
 # public decorator is imported from ..auth
@@ -111,6 +106,26 @@ def _get_main_user_ids(db_conn: sqlite3.Connection) -> str:
     return ",".join(str(row["id"]) for row in all_users[:2]) if all_users else "1,2"
 
 
+def _lookup_options(db_conn: sqlite3.Connection, user_ids: str, income: bool = False):
+    """
+    (categories, users, accounts) rows for the form dropdowns.
+    These tables only change in db.initialise_database(), which drops the cache.
+    """
+    key = "page_lookups:income" if income else "page_lookups:expense"
+    cached = cache_service.get(key)
+    if cached is not None and cached[0] == user_ids:
+        return cached[1]
+    if income:
+        categories = db_conn.execute("SELECT id, name FROM categories WHERE name IN ('משכורת','קליניקה') ORDER BY name").fetchall()
+    else:
+        categories = db_conn.execute("SELECT id, name FROM categories WHERE TRIM(name) NOT IN ('משכורת','קליניקה') ORDER BY name").fetchall()
+    users = db_conn.execute(f"SELECT id, name FROM users WHERE id IN ({user_ids}) ORDER BY id").fetchall()
+    accounts = db_conn.execute("SELECT id, name FROM accounts ORDER BY name").fetchall()
+    options = (categories, users, accounts)
+    cache_service.set(key, (user_ids, options), ttl_seconds=3600)
+    return options
+
+
 @router.get("/login", response_class=HTMLResponse)
 @public
 async def login_page(request: Request) -> HTMLResponse:
@@ -674,9 +689,7 @@ async def finances_transactions(
     ).fetchall()
 
     # For expenses page: exclude income categories from the dropdown
-    categories = db_conn.execute("SELECT id, name FROM categories WHERE TRIM(name) NOT IN ('משכורת','קליניקה') ORDER BY name").fetchall()
-    users = db_conn.execute(f"SELECT id, name FROM users WHERE id IN ({user_ids}) ORDER BY id").fetchall()
-    accounts = db_conn.execute("SELECT id, name FROM accounts ORDER BY name").fetchall()
+    categories, users, accounts = _lookup_options(db_conn, user_ids)
 
     total_pages = max(1, (total + per_page - 1) // per_page)
     pagination = {
@@ -754,9 +767,7 @@ async def finances_income(
     ).fetchall()
 
     # For income page: show only income categories
-    categories = db_conn.execute("SELECT id, name FROM categories WHERE name IN ('משכורת','קליניקה') ORDER BY name").fetchall()
-    users = db_conn.execute(f"SELECT id, name FROM users WHERE id IN ({user_ids}) ORDER BY id").fetchall()
-    accounts = db_conn.execute("SELECT id, name FROM accounts ORDER BY name").fetchall()
+    categories, users, accounts = _lookup_options(db_conn, user_ids, income=True)
 
     total_pages = max(1, (total + per_page - 1) // per_page)
     pagination = {
@@ -938,9 +949,7 @@ async def finances_recurrences(
     recs_enriched_page = recs_enriched[start:end]
 
     # Recurrences are expenses: exclude income categories
-    categories = db_conn.execute("SELECT id, name FROM categories WHERE TRIM(name) NOT IN ('משכורת','קליניקה') ORDER BY name").fetchall()
-    users = db_conn.execute(f"SELECT id, name FROM users WHERE id IN ({user_ids}) ORDER BY id").fetchall()
-    accounts = db_conn.execute("SELECT id, name FROM accounts ORDER BY name").fetchall()
+    categories, users, accounts = _lookup_options(db_conn, user_ids)
 
     total_pages = max(1, (total + per_page - 1) // per_page)
     pagination = {
@@ -1017,9 +1026,7 @@ async def finances_recurrences_active(
     recs = db_conn.execute(base_sql + where_sql + user_filter_sql + " ORDER BY r.id DESC LIMIT ? OFFSET ?", (*params, per_page, offset)).fetchall()
 
     # Active recurrences are expenses: exclude income categories
-    categories = db_conn.execute("SELECT id, name FROM categories WHERE TRIM(name) NOT IN ('משכורת','קליניקה') ORDER BY name").fetchall()
-    users = db_conn.execute(f"SELECT id, name FROM users WHERE id IN ({user_ids}) ORDER BY id").fetchall()
-    accounts = db_conn.execute("SELECT id, name FROM accounts ORDER BY name").fetchall()
+    categories, users, accounts = _lookup_options(db_conn, user_ids)
 
     total_pages = max(1, (total + per_page - 1) // per_page)
     pagination = {
@@ -1195,9 +1202,7 @@ async def edit_recurrence_inline(
 
     row = db_conn.execute("SELECT * FROM recurrences WHERE id = ?", (rec_id,)).fetchone()
     # Edit recurrence: restrict to expense categories
-    categories = db_conn.execute("SELECT id, name FROM categories WHERE TRIM(name) NOT IN ('משכורת','קליניקה') ORDER BY name").fetchall()
-    users = db_conn.execute(f"SELECT id, name FROM users WHERE id IN ({user_ids}) ORDER BY id").fetchall()
-    accounts = db_conn.execute("SELECT id, name FROM accounts ORDER BY name").fetchall()
+    categories, users, accounts = _lookup_options(db_conn, user_ids)
     return templates.TemplateResponse(
         "partials/recurrences/edit_row.html",
         {
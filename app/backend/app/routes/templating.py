@@ -0,0 +1,34 @@
+"""
+Shared Jinja2 templates for the page, partial and workout routers.
+
+One environment means each template is loaded and compiled once per process,
+instead of once per router that renders it.
+"""
+
+from pathlib import Path as FSPath
+
+from fastapi.templating import Jinja2Templates
+
+ROOT_DIR = FSPath(__file__).resolve().parents[3]  # .../expense_tracker/app
+FRONTEND_DIR = ROOT_DIR / "frontend"
+TEMPLATES_DIR = FRONTEND_DIR / "templates"
+
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+# Pages most users hit right after a deploy; compiled at startup by warm_templates()
+HOT_TEMPLATES = (
+    "layout/base.html",
+    "finances/base.html",
+    "pages/login.html",
+    "finances/index.html",
+    "finances/transactions.html",
+    "pages/income.html",
+    "pages/recurrences.html",
+    "finances/statistics.html",
+)
+
+
+def warm_templates() -> None:
+    """Load and compile HOT_TEMPLATES so the first request doesn't pay for it."""
+    for name in HOT_TEMPLATES:
+        templates.get_template(name)
@@ -4,20 +4,13 @@ from datetime import date as date_cls, timedelta
 from typing import Dict, List, Any
 from fastapi import APIRouter, Depends, Request, status
 from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from pathlib import Path as FSPath
 
 from ..db import get_db_conn
 from ..schemas.workouts import WorkoutCreateSchema
+from .templating import templates
 
 logger = logging.getLogger(__name__)
 
-# Resolve template paths matching existing routes style
-ROOT_DIR = FSPath(__file__).resolve().parents[3]
-FRONTEND_DIR = ROOT_DIR / "frontend"
-TEMPLATES_DIR = FRONTEND_DIR / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 router = APIRouter(tags=["workouts"])
 
 # Default Calisthenics Exercises categorized by muscle groups (with Hebrew equivalents for localized UI)
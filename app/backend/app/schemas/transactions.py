@@ -1,4 +1,5 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Tuple
 from pydantic import BaseModel
 
 class TransactionBase(BaseModel):
@@ -28,3 +29,18 @@ class TransactionUpdate(BaseModel):
 
 class Transaction(TransactionBase):
     id: int
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any], columns: Tuple[str, ...]) -> "Transaction":
+        """Build from a trusted DB row without validation.
+
+        ``columns`` are the cursor's column names; columns that are not model
+        fields are skipped.
+        """
+        return cls.model_construct(**{name: row[i] for i, name in _field_indices(columns)})
+
+
+@lru_cache(maxsize=32)
+def _field_indices(columns: Tuple[str, ...]) -> Tuple[Tuple[int, str], ...]:
+    """(position, name) pairs for the result columns that are Transaction fields."""
+    return tuple((i, name) for i, name in enumerate(columns) if name in Transaction.model_fields)
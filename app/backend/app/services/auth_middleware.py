@@ -2,33 +2,45 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Iterable, List, Set, Tuple
+from typing import Any, Dict, FrozenSet, Optional
 from urllib.parse import quote_plus
 from datetime import datetime
 
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import RedirectResponse, Response
+from starlette.responses import RedirectResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from itsdangerous import BadSignature, URLSafeSerializer
 
+# Paths that never need a login (static assets, service worker, health check)
+_ALLOW_PREFIXES = ("/static/",)
+_ALLOW_EXACT = frozenset({"/sw.js", "/health"})
 
-class AuthMiddleware(BaseHTTPMiddleware):
+_auth_logger = logging.getLogger("app.auth")
+
+
+class AuthMiddleware:
     """Auth guard middleware.
 
+    Plain ASGI (not BaseHTTPMiddleware): allowed requests are passed straight
+    to the app, with no extra task or response stream copy per request.
+
     - Allows static assets and service worker.
-    - Allows routes marked @public (provided via regex+methods tuples).
+    - Allows routes marked @public (an exact path -> methods dict, then a
+      method -> combined regex dict for parameterized paths).
     - Requires a logged-in session user for all other routes.
     - For GET: redirects to /login?next=...; for non-GET: redirects to /login.
     """
 
     def __init__(
         self,
-        app: Any,
-        public_route_matchers: Iterable[Tuple[Any, Set[str]]],
+        app: ASGIApp,
+        public_route_matchers: Optional[Dict[str, Any]] = None,
         auth_enabled: bool = True,
+        public_static_paths: Optional[Dict[str, FrozenSet[str]]] = None,
     ) -> None:
-        super().__init__(app)
-        self.public_route_matchers: List[Tuple[Any, Set[str]]] = list(public_route_matchers)
+        self.app = app
+        self.public_route_matchers: Dict[str, Any] = dict(public_route_matchers or {})
+        self.public_static_paths: Dict[str, FrozenSet[str]] = dict(public_static_paths or {})
         self.auth_enabled = auth_enabled
         self.logger = logging.getLogger(__name__)
         # Fallback cookie-based auth (signed).
@@ -43,46 +55,50 @@ class AuthMiddleware(BaseHTTPMiddleware):
         self.secret_key = secret_key
         self.serializer = URLSafeSerializer(self.secret_key, salt="auth-user")
         self.cookie_name = "auth_user"
+        # Environment is fixed for the life of the process; read it once
+        is_production = os.environ.get("RAILWAY_ENVIRONMENT") is not None or os.environ.get("ENVIRONMENT") == "production"
+        self.log_requests = not is_production
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if not self.auth_enabled:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.auth_enabled or self._allowed(scope, receive):
+            await self.app(scope, receive, send)
+            return
+        # Not authenticated -> always go to /login (no next param)
+        await RedirectResponse(url="/login", status_code=302)(scope, receive, send)
 
-        path = request.url.path
-        method = (request.method or "GET").upper()
+    def _allowed(self, scope: Scope, receive: Receive) -> bool:
+        """True if the request may reach the app; logs the reason it may not."""
+        # Read straight from the scope; request.url would rebuild the full URL
+        path = scope["path"]
+        method = (scope.get("method") or "GET").upper()
 
         # Lightweight per-request log. We deliberately do NOT log cookies, headers,
         # or the full session dict — those contain auth tokens that would leak if
         # log files are ever exposed.
-        auth_logger = logging.getLogger("app.auth")
-        is_production = os.environ.get("RAILWAY_ENVIRONMENT") is not None or os.environ.get("ENVIRONMENT") == "production"
-        if not is_production:
-            auth_logger.debug(f"Request: {method} {path}")
+        if self.log_requests and _auth_logger.isEnabledFor(logging.DEBUG):
+            _auth_logger.debug("Request: %s %s", method, path)
 
-        # Allow unauthenticated access to static and service worker
-        if path.startswith("/static/") or path == "/sw.js":
-            return await call_next(request)
-        # Always allow health endpoint
-        if path == "/health":
-            return await call_next(request)
+        # Allow unauthenticated access to static assets, service worker and health
+        if path in _ALLOW_EXACT or path.startswith(_ALLOW_PREFIXES):
+            return True
 
-        # Allow @public endpoints
+        # Allow @public endpoints: exact paths by dict lookup, the rest by regex
+        public_methods = self.public_static_paths.get(path)
+        if public_methods is not None and method in public_methods:
+            return True
         try:
-            for regex, methods in self.public_route_matchers:
-                try:
-                    if regex.match(path) and (not methods or method in methods):
-                        self.logger.debug("AuthMiddleware: public route allowed", extra={
-                            "path": path,
-                            "method": method,
-                        })
-                        return await call_next(request)
-                except Exception:
-                    # Best-effort; ignore a broken matcher
-                    continue
+            public_re = self.public_route_matchers.get(method)
+            if public_re is not None and public_re.match(path):
+                self.logger.debug("AuthMiddleware: public route allowed", extra={
+                    "path": path,
+                    "method": method,
+                })
+                return True
         except Exception:
             self.logger.exception("AuthMiddleware: error checking public matchers")
 
         # Require a session user for everything else
+        request = Request(scope, receive)
         user_obj = None
         user_in_session = False
 
@@ -127,22 +143,20 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 })
 
         if user_in_session:
-            return await call_next(request)
+            return True
 
-        # Not authenticated -> always go to /login (no next param)
         if method == "GET":
             # Special-case: avoid loop for /logout
-            if path == "/logout":
-                return RedirectResponse(url="/login", status_code=302)
-            self.logger.info("AuthMiddleware: redirecting unauthenticated GET", extra={
-                "path": path,
-            })
-            return RedirectResponse(url="/login", status_code=302)
+            if path != "/logout":
+                self.logger.info("AuthMiddleware: redirecting unauthenticated GET", extra={
+                    "path": path,
+                })
+            return False
 
         self.logger.info("AuthMiddleware: redirecting unauthenticated non-GET", extra={
             "path": path,
             "method": method,
         })
-        return RedirectResponse(url="/login", status_code=302)
+        return False
 
 
@@ -2,16 +2,16 @@
 Backup service for creating and managing database backups.
 """
 
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, date
-from typing import Optional, List, Dict, Tuple
+from typing import Iterator, Optional, List, Dict, Tuple
 import sqlite3
 import logging
 import zipfile
 import shutil
 import os
 
-from openpyxl import Workbook
 
 LOG = logging.getLogger(__name__)
 
@@ -36,6 +36,33 @@ RECURRENCES_HEADERS = [
 ]
 
 
+# Column lists matching the headers above, one per sheet. Cells are formatted by
+# SQLite (blank for missing values, כן/לא for active) so rows are appended as-is.
+_EXPENSES_SQL = """
+    SELECT t.id, t.date, t.amount, c.name, u.name,
+           COALESCE(a.name, ''), COALESCE(t.notes, ''), COALESCE(t.tags, ''),
+           COALESCE(t.recurrence_id, '')
+    FROM transactions t
+    LEFT JOIN categories c ON t.category_id = c.id
+    LEFT JOIN users u ON t.user_id = u.id
+    LEFT JOIN accounts a ON t.account_id = a.id
+    WHERE t.date >= ? AND t.date < ?
+    ORDER BY t.date ASC, t.id ASC
+"""
+
+_RECURRENCES_SQL = """
+    SELECT r.id, r.name, r.amount, c.name, u.name,
+           r.frequency, r.next_charge_date,
+           COALESCE(NULLIF(r.day_of_month, 0), ''), COALESCE(NULLIF(r.weekday, 0), ''),
+           CASE WHEN r.active THEN 'כן' ELSE 'לא' END
+    FROM recurrences r
+    LEFT JOIN categories c ON r.category_id = c.id
+    LEFT JOIN users u ON r.user_id = u.id
+    WHERE r.active = 1
+    ORDER BY r.name ASC
+"""
+
+
 def _last_n_months(n: int) -> List[Tuple[int, int]]:
     """Return list of (year, month) for current month and previous n-1 months."""
     today = date.today()
@@ -82,7 +109,116 @@ def _open_conn_from_path_or_conn(db_conn: Optional[sqlite3.Connection]) -> sqlit
     db_path = _find_db_file()
     if not db_path:
         raise RuntimeError("No DB connection provided and DB file not found in known locations")
-    return sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path))
+    # Backups only read: a bigger page cache, in-memory temp b-trees (ORDER BY) and
+    # mmap'd reads suit the long scans; query_only guards against accidental writes.
+    try:
+        conn.execute("PRAGMA cache_size = -65536")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        conn.execute("PRAGMA query_only = ON")
+    except sqlite3.Error:
+        pass
+    return conn
+
+
+@contextmanager
+def _read_snapshot(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run the enclosed reads in one transaction so every sheet sees the same data."""
+    began = not conn.in_transaction
+    if began:
+        conn.execute("BEGIN")
+    try:
+        yield
+    finally:
+        if began:
+            conn.rollback()
+
+
+def _durable_replace(tmp_path: Path, final_path: Path) -> None:
+    """Move a fully written temp file into place so it survives a crash.
+
+    The file is fsync'd before the rename and the directory after it; rename alone
+    is atomic but not durable and can leave an empty or torn file behind.
+    """
+    fd = os.open(str(tmp_path), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(str(tmp_path), str(final_path))
+    if os.name != "nt":  # directories can't be fsync'd on Windows
+        dir_fd = os.open(str(final_path.parent), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+_BACKUP_FETCH_SIZE = 2000
+
+
+def _iter_batches(cursor: sqlite3.Cursor) -> Iterator:
+    """Yield a cursor's rows, fetched from SQLite in fetchmany() batches."""
+    while True:
+        batch = cursor.fetchmany(_BACKUP_FETCH_SIZE)
+        if not batch:
+            return
+        yield from batch
+
+
+def _fetch_active_recurrences(conn: sqlite3.Connection) -> List[tuple]:
+    """Rows for the recurrences sheet (the same in every monthly workbook)."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(_RECURRENCES_SQL)
+    return cur.fetchall()
+
+
+def _write_monthly_workbook(
+    conn: sqlite3.Connection,
+    year: int,
+    month: int,
+    file_path: Path,
+    recurrence_rows: Optional[List[tuple]] = None,
+) -> None:
+    """Write one month's expenses and the active recurrences to an xlsx file.
+
+    recurrence_rows can be passed in when writing several months in a row, so the
+    recurrences query runs once instead of once per workbook.
+    """
+    month_start = f"{year}-{month:02d}-01"
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    month_end = f"{next_year}-{next_month:02d}-01"
+
+    # openpyxl is heavy (~0.1s to import); load it on first backup, not at app import
+    from openpyxl import Workbook
+
+    # Write-only workbook: rows are serialized as they are appended instead of
+    # being kept as cell objects, so memory stays flat for large months.
+    wb = Workbook(write_only=True)
+
+    # Create expenses sheet
+    expenses_ws = wb.create_sheet("הוצאות")
+    expenses_ws.append(EXPENSES_HEADERS)
+
+    # Plain tuple rows; no sqlite3.Row objects per row
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(_EXPENSES_SQL, (month_start, month_end))
+    for row in _iter_batches(cur):
+        expenses_ws.append(row)
+
+    # Create recurrences sheet
+    recurrences_ws = wb.create_sheet("הוצאות קבועות")
+    recurrences_ws.append(RECURRENCES_HEADERS)
+
+    if recurrence_rows is None:
+        recurrence_rows = _fetch_active_recurrences(conn)
+    for row in recurrence_rows:
+        recurrences_ws.append(row)
+
+    wb.save(filename=str(file_path))
 
 
 def create_backup_file(db_conn: Optional[sqlite3.Connection] = None) -> Path:
@@ -116,94 +252,22 @@ def create_backup_file(db_conn: Optional[sqlite3.Connection] = None) -> Path:
         out_dir.mkdir(parents=True, exist_ok=True)
 
         months = _last_n_months(6)
-        for (year, month) in months:
-            ym = f"{year}-{month:02d}"
-            
-            # Create workbook with two sheets
-            wb = Workbook()
-            
-            # Remove default sheet and create our own
-            wb.remove(wb.active)
-            
-            # Create expenses sheet
-            expenses_ws = wb.create_sheet("הוצאות")
-            expenses_ws.append(EXPENSES_HEADERS)
-            
-            # Get expenses for this month
-            expenses_cur = conn.execute(
-                """
-                SELECT t.id, t.date, t.amount, c.name as category, u.name as user, 
-                       a.name as account, t.notes, t.tags, t.recurrence_id
-                FROM transactions t
-                LEFT JOIN categories c ON t.category_id = c.id
-                LEFT JOIN users u ON t.user_id = u.id
-                LEFT JOIN accounts a ON t.account_id = a.id
-                WHERE strftime('%Y-%m', t.date) = ?
-                ORDER BY t.date ASC, t.id ASC
-                """,
-                (ym,),
-            )
-            expenses_rows = expenses_cur.fetchall()
-            
-            for r in expenses_rows:
-                vals = [
-                    r["id"],
-                    r["date"],
-                    r["amount"],
-                    r["category"],
-                    r["user"],
-                    r["account"] or "",
-                    r["notes"] or "",
-                    r["tags"] or "",
-                    r["recurrence_id"] or "",
-                ]
-                expenses_ws.append(vals)
-            
-            # Create recurrences sheet
-            recurrences_ws = wb.create_sheet("הוצאות קבועות")
-            recurrences_ws.append(RECURRENCES_HEADERS)
-            
-            # Get all active recurrences
-            recurrences_cur = conn.execute(
-                """
-                SELECT r.id, r.name, r.amount, c.name as category, u.name as user,
-                       r.frequency, r.next_charge_date, r.day_of_month, 
-                       r.weekday, r.active
-                FROM recurrences r
-                LEFT JOIN categories c ON r.category_id = c.id
-                LEFT JOIN users u ON r.user_id = u.id
-                WHERE r.active = 1
-                ORDER BY r.name ASC
-                """,
-            )
-            recurrences_rows = recurrences_cur.fetchall()
-            
-            for r in recurrences_rows:
-                vals = [
-                    r["id"],
-                    r["name"],
-                    r["amount"],
-                    r["category"],
-                    r["user"],
-                    r["frequency"],
-                    r["next_charge_date"],
-                    r["day_of_month"] or "",
-                    r["weekday"] or "",
-                    "כן" if r["active"] else "לא",
-                ]
-                recurrences_ws.append(vals)
-            
-            # Save the workbook
-            file_name = f"monthly_backup_{year}_{month:02d}.xlsx"
-            wb.save(filename=str(out_dir / file_name))
+        with _read_snapshot(conn):
+            recurrence_rows = _fetch_active_recurrences(conn)
+            for (year, month) in months:
+                file_name = f"monthly_backup_{year}_{month:02d}.xlsx"
+                _write_monthly_workbook(conn, year, month, out_dir / file_name, recurrence_rows)
 
             # Zip the folder so it can be downloaded directly
         zip_path = BACKUP_DIR / f"{folder_name}.zip"
-        with zipfile.ZipFile(str(zip_path), "w", zipfile.ZIP_DEFLATED) as zf:
+        tmp_zip = BACKUP_DIR / f".{folder_name}.zip.tmp"
+        with zipfile.ZipFile(str(tmp_zip), "w", zipfile.ZIP_DEFLATED) as zf:
             for f in out_dir.iterdir():
                 if f.is_file():
                     zf.write(f, arcname=f.name)
+        _durable_replace(tmp_zip, zip_path)
         shutil.rmtree(out_dir)
+        invalidate_backup_list_cache()
 
         LOG.info("Created backup zip %s", zip_path.name)
     finally:
@@ -243,86 +307,12 @@ def create_monthly_backup(year: int, month: int, db_conn: Optional[sqlite3.Conne
         except Exception:
             pass
 
-        ym = f"{year}-{month:02d}"
-        
-        # Create workbook with two sheets
-        wb = Workbook()
-        
-        # Remove default sheet and create our own
-        wb.remove(wb.active)
-        
-        # Create expenses sheet
-        expenses_ws = wb.create_sheet("הוצאות")
-        expenses_ws.append(EXPENSES_HEADERS)
-        
-        # Get expenses for this month
-        expenses_cur = conn.execute(
-            """
-            SELECT t.id, t.date, t.amount, c.name as category, u.name as user, 
-                   a.name as account, t.notes, t.tags, t.recurrence_id
-            FROM transactions t
-            LEFT JOIN categories c ON t.category_id = c.id
-            LEFT JOIN users u ON t.user_id = u.id
-            LEFT JOIN accounts a ON t.account_id = a.id
-            WHERE strftime('%Y-%m', t.date) = ?
-            ORDER BY t.date ASC, t.id ASC
-            """,
-            (ym,),
-        )
-        expenses_rows = expenses_cur.fetchall()
-        
-        for r in expenses_rows:
-            vals = [
-                r["id"],
-                r["date"],
-                r["amount"],
-                r["category"],
-                r["user"],
-                r["account"] or "",
-                r["notes"] or "",
-                r["tags"] or "",
-                r["recurrence_id"] or "",
-            ]
-            expenses_ws.append(vals)
-        
-        # Create recurrences sheet
-        recurrences_ws = wb.create_sheet("הוצאות קבועות")
-        recurrences_ws.append(RECURRENCES_HEADERS)
-        
-        # Get all active recurrences
-        recurrences_cur = conn.execute(
-            """
-            SELECT r.id, r.name, r.amount, c.name as category, u.name as user,
-                   r.frequency, r.next_charge_date, r.day_of_month, 
-                   r.weekday, r.active
-            FROM recurrences r
-            LEFT JOIN categories c ON r.category_id = c.id
-            LEFT JOIN users u ON r.user_id = u.id
-            WHERE r.active = 1
-            ORDER BY r.name ASC
-            """,
-        )
-        recurrences_rows = recurrences_cur.fetchall()
-        
-        for r in recurrences_rows:
-            vals = [
-                r["id"],
-                r["name"],
-                r["amount"],
-                r["category"],
-                r["user"],
-                r["frequency"],
-                r["next_charge_date"],
-                r["day_of_month"] or "",
-                r["weekday"] or "",
-                "כן" if r["active"] else "לא",
-            ]
-            recurrences_ws.append(vals)
-        
-        # Save the workbook
         file_name = f"monthly_backup_{year}_{month:02d}.xlsx"
         file_path = EXCEL_ROOT / file_name
-        wb.save(filename=str(file_path))
+        tmp_path = EXCEL_ROOT / f".{file_name}.tmp"
+        _write_monthly_workbook(conn, year, month, tmp_path)
+        _durable_replace(tmp_path, file_path)
+        invalidate_backup_list_cache()
 
         LOG.info("Created monthly backup file %s", file_name)
         return file_path
@@ -335,45 +325,76 @@ def create_monthly_backup(year: int, month: int, db_conn: Optional[sqlite3.Conne
                 pass
 
 
+# list_backup_files() result, reused while neither backup directory has changed
+_LIST_CACHE: Dict[str, object] = {"key": None, "data": None}
+
+
+def invalidate_backup_list_cache() -> None:
+    """Forget the cached listing (call after writing/deleting backup files)."""
+    _LIST_CACHE["key"] = None
+    _LIST_CACHE["data"] = None
+
+
+def _dir_mtime_ns(directory: Path) -> Optional[int]:
+    try:
+        return directory.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_backup_dir(directory: Path, suffixes: Optional[Tuple[str, ...]] = None) -> List[Dict]:
+    """Files in directory, newest first. scandir's DirEntry reuses the directory read."""
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            if name.startswith("."):
+                continue
+            if suffixes is not None and os.path.splitext(name)[1].lower() not in suffixes:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                LOG.exception("Failed to stat backup entry %s", entry.path)
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+    entries.sort(reverse=True)
+    return [
+        {
+            "file_name": name,
+            "created_at": datetime.fromtimestamp(mtime).isoformat(),
+            "size": size,
+        }
+        for mtime, name, size in entries
+    ]
+
+
 def list_backup_files() -> List[Dict]:
     """
     List downloadable backup items:
     - ZIP files directly in BACKUP_DIR (full backups)
     - XLSX files inside BACKUP_DIR/excel/ (monthly backups)
     Directories are skipped (legacy; full backups now produce zips).
-    """
-    items = []
 
-    # Full backup zips
-    for p in sorted(BACKUP_DIR.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True):
-        if not p.is_file():
-            continue
-        try:
-            stat = p.stat()
-            items.append({
-                "file_name": p.name,
-                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                "size": stat.st_size,
-            })
-        except Exception:
-            LOG.exception("Failed to stat backup entry %s", p)
+    The result is cached until either directory's mtime changes or
+    invalidate_backup_list_cache() is called.
+    """
+    key = (_dir_mtime_ns(BACKUP_DIR), _dir_mtime_ns(EXCEL_ROOT))
+    if _LIST_CACHE["key"] == key and _LIST_CACHE["data"] is not None:
+        return list(_LIST_CACHE["data"])
 
-    # Monthly Excel files
+    items = _scan_backup_dir(BACKUP_DIR)
     if EXCEL_ROOT.is_dir():
-        for p in sorted(EXCEL_ROOT.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True):
-            if not p.is_file() or p.suffix.lower() not in (".xlsx", ".xlsm"):
-                continue
-            try:
-                stat = p.stat()
-                items.append({
-                    "file_name": p.name,
-                    "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    "size": stat.st_size,
-                })
-            except Exception:
-                LOG.exception("Failed to stat excel backup entry %s", p)
+        items += _scan_backup_dir(EXCEL_ROOT, (".xlsx", ".xlsm"))
+
+    _LIST_CACHE["key"] = key
+    _LIST_CACHE["data"] = items
+    return list(items)
+
 
-    return items
+_COPY_CHUNK_SIZE = 1024 * 1024
 
 
 def restore_from_file(path: Path) -> Dict:
@@ -389,19 +410,24 @@ def restore_from_file(path: Path) -> Dict:
         raise FileNotFoundError(str(p))
 
     if p.is_file() and zipfile.is_zipfile(str(p)):
+        # Stream each member into a hidden temp file next to its target and only
+        # then publish it, so a bad member never truncates an existing workbook.
+        # Only the base name is used, so members can't escape EXCEL_ROOT.
         with zipfile.ZipFile(str(p), "r") as zf:
-            tmp = BACKUP_DIR / f".restore_tmp_{datetime.utcnow().timestamp()}"
-            if tmp.exists():
-                shutil.rmtree(tmp)
-            tmp.mkdir(parents=True, exist_ok=True)
-            zf.extractall(tmp)
-            for f in tmp.iterdir():
-                dst = EXCEL_ROOT / f.name
-                if dst.exists():
-                    dst.unlink()
-                shutil.move(str(f), str(dst))
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                name = Path(info.filename).name
+                dst = EXCEL_ROOT / name
+                tmp = EXCEL_ROOT / f".{name}.tmp"
+                try:
+                    with zf.open(info) as src, open(tmp, "wb") as out:
+                        shutil.copyfileobj(src, out, _COPY_CHUNK_SIZE)
+                    _durable_replace(tmp, dst)
+                except BaseException:
+                    tmp.unlink(missing_ok=True)
+                    raise
                 restored["files"] += 1
-            shutil.rmtree(tmp)
     elif p.is_dir():
         for f in p.iterdir():
             if f.is_file() and f.suffix.lower() in (".xlsx", ".xlsm", ".xltx"):
@@ -413,5 +439,7 @@ def restore_from_file(path: Path) -> Dict:
     else:
         raise RuntimeError("Unsupported restore file type")
 
+    # Overwriting files in place doesn't bump the directory mtime
+    invalidate_backup_list_cache()
     LOG.info("Restored %d files from %s", restored["files"], p.name)
     return restored
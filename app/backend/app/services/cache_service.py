@@ -5,7 +5,7 @@ Uses in-memory cache with TTL (Time To Live) for efficiency.
 
 import time
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +15,8 @@ class CacheService:
     def __init__(self):
         """Initialize the cache service."""
         self._cache: Dict[str, Dict[str, Any]] = {}
+        # Keys whose data changed since they were cached; see mark_dirty()
+        self._dirty: Set[str] = set()
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired."""
@@ -46,22 +48,40 @@ class CacheService:
     def invalidate(self, key: str) -> None:
         """Remove specific key from cache."""
         logger.info(f"Cache INVALIDATE for key: {key}")
+        self._dirty.discard(key)
         if key in self._cache:
             del self._cache[key]
             logger.info(f"Cache key {key} removed")
         else:
             logger.info(f"Cache key {key} not found for invalidation")
     
+    def mark_dirty(self, key: str) -> None:
+        """Flag a key as stale without dropping it yet.
+
+        Writers call this instead of invalidate(); a burst of writes between two
+        reads then costs a single invalidation, done by flush_if_dirty() on read.
+        """
+        self._dirty.add(key)
+
+    def flush_if_dirty(self, key: str) -> bool:
+        """Invalidate key if it was marked dirty. Returns True if it was."""
+        if key not in self._dirty:
+            return False
+        self.invalidate(key)
+        return True
+    
     def clear(self) -> None:
         """Clear all cache."""
         logger.info(f"Cache CLEAR - removing {len(self._cache)} entries")
         self._cache.clear()
+        self._dirty.clear()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         stats = {
             'total_entries': len(self._cache),
-            'keys': list(self._cache.keys())
+            'keys': list(self._cache.keys()),
+            'dirty_keys': sorted(self._dirty),
         }
         logger.info(f"Cache STATS: {stats}")
         return stats
@@ -1,9 +1,75 @@
 from __future__ import annotations
 
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from typing import Callable, Dict, Set, Tuple
+
+# File writes happen on a QueueListener thread; loggers only get a QueueHandler,
+# so logging from a request (or the event loop) never blocks on disk I/O.
+# Keyed by log file path so repeated configuration reuses the same file handle.
+_queued_file_handlers: Dict[str, Tuple[QueueHandler, QueueListener]] = {}
+# Keys of the listeners whose writer thread is currently running
+_started_listeners: Set[str] = set()
+
+
+# Log dirs already configured in this process. Module reloads (tests,
+# uvicorn --reload re-imports of main) then skip the whole setup block.
+_configured_log_dirs: Set[str] = set()
+
+
+def claim_log_dir(log_dir: Path) -> bool:
+    """Return True the first time a log dir is configured, False afterwards."""
+    key = str(log_dir)
+    if key in _configured_log_dirs:
+        return False
+    _configured_log_dirs.add(key)
+    return True
+
+
+def queued_file_handler(
+    path: Path,
+    formatter: logging.Formatter,
+    level: int,
+    factory: Callable[..., logging.Handler] = logging.FileHandler,
+    **kwargs,
+) -> QueueHandler:
+    """Return the QueueHandler feeding a background writer for ``path`` (created once)."""
+    key = str(path)
+    entry = _queued_file_handlers.get(key)
+    if entry is None:
+        file_handler = factory(key, **kwargs)
+        file_handler.setLevel(level)
+        file_handler.setFormatter(formatter)
+        listener = QueueListener(queue.SimpleQueue(), file_handler, respect_handler_level=True)
+        queue_handler = QueueHandler(listener.queue)
+        # Filter before enqueueing, so dropped records cost nothing downstream
+        queue_handler.setLevel(level)
+        entry = _queued_file_handlers[key] = (queue_handler, listener)
+    queue_handler, listener = entry
+    if key not in _started_listeners:
+        listener.start()
+        _started_listeners.add(key)
+    return queue_handler
+
+
+def start_log_listeners() -> None:
+    """(Re)start the writer thread of every registered log file (on startup)."""
+    for key, (_, listener) in _queued_file_handlers.items():
+        if key not in _started_listeners:
+            listener.start()
+            _started_listeners.add(key)
+
+
+def stop_log_listeners() -> None:
+    """Flush queued records to disk and stop the writer threads (on shutdown)."""
+    for key, (_, listener) in _queued_file_handlers.items():
+        if key in _started_listeners:
+            listener.stop()
+            _started_listeners.discard(key)
 
 
 class PrintToLogHandler:
@@ -26,7 +92,9 @@ class PrintToLogHandler:
         self.original_stdout.flush()
         
     def __enter__(self):
-        sys.stdout = self
+        # Don't stack a second redirect on top of one from an earlier import
+        if not isinstance(sys.stdout, PrintToLogHandler):
+            sys.stdout = self
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -36,8 +104,10 @@ class PrintToLogHandler:
 def configure_logging(log_dir: Path) -> None:
     """Configure application logging (file + console) and attach to uvicorn loggers.
 
-    Idempotent: safe to call multiple times.
+    Idempotent: safe to call multiple times; repeat calls return immediately.
     """
+    if not claim_log_dir(log_dir):
+        return
     log_dir.mkdir(parents=True, exist_ok=True)
     
     # Create separate log files for different purposes
@@ -53,18 +123,10 @@ def configure_logging(log_dir: Path) -> None:
     debug_fmt = "%(asctime)s %(levelname)s %(name)s [%(filename)s:%(lineno)d]: %(message)s"
     debug_formatter = logging.Formatter(debug_fmt)
 
-    # File handlers
-    server_handler = logging.FileHandler(str(server_log_path))
-    server_handler.setLevel(logging.DEBUG)
-    server_handler.setFormatter(formatter)
-
-    auth_handler = logging.FileHandler(str(auth_log_path))
-    auth_handler.setLevel(logging.DEBUG)
-    auth_handler.setFormatter(formatter)
-
-    debug_handler = logging.FileHandler(str(debug_log_path))
-    debug_handler.setLevel(logging.DEBUG)
-    debug_handler.setFormatter(debug_formatter)
+    # File handlers (queued; see queued_file_handler)
+    server_handler = queued_file_handler(server_log_path, formatter, logging.DEBUG)
+    auth_handler = queued_file_handler(auth_log_path, formatter, logging.DEBUG)
+    debug_handler = queued_file_handler(debug_log_path, debug_formatter, logging.DEBUG)
 
     # Console handler
     stream_handler = logging.StreamHandler(sys.stderr)
@@ -76,11 +138,7 @@ def configure_logging(log_dir: Path) -> None:
     root_logger.setLevel(logging.DEBUG)
 
     # Add handlers if not already present
-    if not any(
-        getattr(h, "baseFilename", None) == str(server_log_path)
-        for h in root_logger.handlers
-        if isinstance(h, logging.FileHandler)
-    ):
+    if server_handler not in root_logger.handlers:
         root_logger.addHandler(server_handler)
 
     if not any(isinstance(h, logging.StreamHandler) for h in root_logger.handlers):
@@ -89,43 +147,30 @@ def configure_logging(log_dir: Path) -> None:
     # Configure specific loggers
     auth_logger = logging.getLogger("app.auth")
     auth_logger.setLevel(logging.DEBUG)
-    if not any(
-        getattr(h, "baseFilename", None) == str(auth_log_path)
-        for h in auth_logger.handlers
-        if isinstance(h, logging.FileHandler)
-    ):
+    if auth_handler not in auth_logger.handlers:
         auth_logger.addHandler(auth_handler)
 
     # Debug logger for print statements and detailed debugging
     debug_logger = logging.getLogger("app.debug")
     debug_logger.setLevel(logging.DEBUG)
-    if not any(
-        getattr(h, "baseFilename", None) == str(debug_log_path)
-        for h in debug_logger.handlers
-        if isinstance(h, logging.FileHandler)
-    ):
+    if debug_handler not in debug_logger.handlers:
         debug_logger.addHandler(debug_handler)
 
     # Print logger for capturing print statements
     print_logger = logging.getLogger("app.print")
     print_logger.setLevel(logging.DEBUG)
-    if not any(
-        getattr(h, "baseFilename", None) == str(debug_log_path)
-        for h in print_logger.handlers
-        if isinstance(h, logging.FileHandler)
-    ):
+    if debug_handler not in print_logger.handlers:
         print_logger.addHandler(debug_handler)
 
     # Uvicorn loggers
-    for uv_logger_name in ("uvicorn.error", "uvicorn.access", "uvicorn"):
+    for uv_logger_name in ("uvicorn.error", "uvicorn"):
         lg = logging.getLogger(uv_logger_name)
         lg.setLevel(logging.DEBUG)
-        if not any(
-            getattr(h, "baseFilename", None) == str(server_log_path)
-            for h in lg.handlers
-            if isinstance(h, logging.FileHandler)
-        ):
+        if server_handler not in lg.handlers:
             lg.addHandler(server_handler)
+    # Per-request access lines are off by default; they cost more than a
+    # trivial request itself. Lower this level to get them back when debugging.
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
 
 def redirect_prints_to_logs() -> PrintToLogHandler:
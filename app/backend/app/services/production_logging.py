@@ -10,12 +10,17 @@ from pathlib import Path
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 
+from .logging_service import claim_log_dir, queued_file_handler
+
 
 def setup_production_logging(log_dir: Path) -> None:
     """
     Setup enhanced logging for production environment.
     Creates separate log files for different components and enables log rotation.
+    Runs once per log dir; later calls are no-ops.
     """
+    if not claim_log_dir(log_dir):
+        return
     log_dir.mkdir(parents=True, exist_ok=True)
     
     # Log file paths
@@ -32,30 +37,13 @@ def setup_production_logging(log_dir: Path) -> None:
         '%(asctime)s %(levelname)s %(name)s: %(message)s'
     )
     
-    # Create rotating file handlers (max 10MB, keep 5 files)
-    server_handler = RotatingFileHandler(
-        str(server_log), maxBytes=10*1024*1024, backupCount=5
-    )
-    server_handler.setLevel(logging.INFO)
-    server_handler.setFormatter(simple_formatter)
-    
-    auth_handler = RotatingFileHandler(
-        str(auth_log), maxBytes=10*1024*1024, backupCount=5
-    )
-    auth_handler.setLevel(logging.DEBUG)
-    auth_handler.setFormatter(detailed_formatter)
-    
-    debug_handler = RotatingFileHandler(
-        str(debug_log), maxBytes=10*1024*1024, backupCount=5
-    )
-    debug_handler.setLevel(logging.DEBUG)
-    debug_handler.setFormatter(detailed_formatter)
-    
-    error_handler = RotatingFileHandler(
-        str(error_log), maxBytes=10*1024*1024, backupCount=5
-    )
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(detailed_formatter)
+    # Create rotating file handlers (max 10MB, keep 5 files), written from a
+    # background thread via queued_file_handler
+    rotate = {"factory": RotatingFileHandler, "maxBytes": 10*1024*1024, "backupCount": 5}
+    server_handler = queued_file_handler(server_log, simple_formatter, logging.INFO, **rotate)
+    auth_handler = queued_file_handler(auth_log, detailed_formatter, logging.DEBUG, **rotate)
+    debug_handler = queued_file_handler(debug_log, detailed_formatter, logging.DEBUG, **rotate)
+    error_handler = queued_file_handler(error_log, detailed_formatter, logging.ERROR, **rotate)
     
     # Console handler for immediate visibility
     console_handler = logging.StreamHandler(sys.stderr)
@@ -82,12 +70,13 @@ def setup_production_logging(log_dir: Path) -> None:
     print_logger.setLevel(logging.DEBUG)
     print_logger.addHandler(debug_handler)
     
-    # Uvicorn loggers
-    for uv_logger_name in ("uvicorn.error", "uvicorn.access", "uvicorn"):
+    # Uvicorn loggers (access log off; see configure_logging)
+    for uv_logger_name in ("uvicorn.error", "uvicorn"):
         uv_logger = logging.getLogger(uv_logger_name)
         uv_logger.setLevel(logging.INFO)
         uv_logger.addHandler(server_handler)
         uv_logger.addHandler(error_handler)
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     
     # Log startup message
     startup_logger = logging.getLogger("app.startup")
@@ -124,6 +113,9 @@ def log_environment_info() -> None:
 def log_request_details(request, logger_name: str = "app.requests") -> None:
     """Log non-sensitive request info. Cookies and Authorization are deliberately omitted."""
     request_logger = logging.getLogger(logger_name)
+    # Skip copying headers/query params when DEBUG is filtered out anyway
+    if not request_logger.isEnabledFor(logging.DEBUG):
+        return
     safe_headers = {
         k: v for k, v in request.headers.items()
         if k.lower() not in {"cookie", "authorization", "x-api-key", "proxy-authorization"}
@@ -138,16 +130,18 @@ def log_request_details(request, logger_name: str = "app.requests") -> None:
     }
     request_logger.debug("Request details:")
     for key, value in request_info.items():
-        request_logger.debug(f"  {key}: {value}")
+        request_logger.debug("  %s: %s", key, value)
 
 
 def log_session_details(request, logger_name: str = "app.sessions") -> None:
     """Log session shape only. The full session dict is never logged — it carries the user identity."""
     session_logger = logging.getLogger(logger_name)
+    if not session_logger.isEnabledFor(logging.DEBUG):
+        return
     session_info = {
         "session_keys": list(request.session.keys()) if hasattr(request.session, 'keys') else [],
         "has_user": bool(request.session.get("user")) if hasattr(request.session, 'get') else False,
     }
     session_logger.debug("Session details:")
     for key, value in session_info.items():
-        session_logger.debug(f"  {key}: {value}")
+        session_logger.debug("  %s: %s", key, value)
@@ -30,17 +30,37 @@ function getLast6Months(data, category = "total") {
   return last6.sort((a, b) => a.ym.localeCompare(b.ym));
 }
 
+// The matrix holds every category's series, so switching the selector
+// filters client-side instead of issuing a request per category.
+let matrixPromise = null;
+
+function fetchMatrix() {
+  if (!matrixPromise) {
+    matrixPromise = fetch(`/api/statistics/matrix`, { credentials: "same-origin" })
+      .then(res => {
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json();
+      })
+      .catch(err => {
+        matrixPromise = null;
+        throw err;
+      });
+  }
+  return matrixPromise;
+}
+
 async function fetchMonthlyData(category = "total") {
   console.debug("[monthly] fetchMonthlyData", { category });
   try {
-    const res = await fetch(`/api/statistics/monthly?category=${encodeURIComponent(category)}`, { credentials: "same-origin" });
-    if (!res.ok) throw new Error(`HTTP ${res.status}`);
-    const json = await res.json();
-    console.debug("[monthly] fetched", { len: Array.isArray(json) ? json.length : 0 });
+    const matrix = await fetchMatrix();
+    const months = Array.isArray(matrix?.months) ? matrix.months : [];
+    const series = matrix?.values?.[category] || [];
+    const json = months.map((ym, i) => ({ ym, expenses: Number(series[i] || 0) }));
+    console.debug("[monthly] fetched", { len: json.length });
     return json;
   } catch (err) {
     console.warn("[monthly] fetch failed, falling back to inline monthly-data", err);
-    return readJSONScript("monthly-data");
+    return getLast6Months(readJSONScript("monthly-data"), category);
   }
 }
 
@@ -0,0 +1,75 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from itsdangerous import URLSafeSerializer
+
+
+def _client():
+    from app.backend.app.auth import public, build_public_route_matchers, build_public_static_paths
+    from app.backend.app.services.auth_middleware import AuthMiddleware
+
+    app = FastAPI()
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/open/{item_id}")
+    @public
+    def open_item(item_id: int):
+        return {"id": item_id}
+
+    @app.post("/open")
+    @public
+    def open_post():
+        return {"open": True}
+
+    @app.get("/private")
+    def private():
+        return {"secret": True}
+
+    @app.post("/private")
+    def private_post():
+        return {"secret": True}
+
+    app.add_middleware(
+        AuthMiddleware,
+        public_route_matchers=build_public_route_matchers(app),
+        public_static_paths=build_public_static_paths(app),
+    )
+    return TestClient(app), AuthMiddleware
+
+
+def test_unauthenticated_requests_redirect_to_login():
+    client, _ = _client()
+    for method in ("get", "post"):
+        r = getattr(client, method)("/private", follow_redirects=False)
+        assert r.status_code == 302
+        assert r.headers["location"] == "/login"
+
+
+def test_health_and_public_routes_pass():
+    client, _ = _client()
+    assert client.get("/health").json() == {"status": "ok"}
+    assert client.get("/open/7").json() == {"id": 7}
+
+
+def test_signed_cookie_grants_access():
+    client, middleware_cls = _client()
+    secret = middleware_cls(None).secret_key
+    token = URLSafeSerializer(secret, salt="auth-user").dumps({"u": "Yosef"})
+    client.cookies.set("auth_user", token)
+    assert client.get("/private").json() == {"secret": True}
+
+    client.cookies.set("auth_user", token + "x")
+    assert client.get("/private", follow_redirects=False).status_code == 302
+
+
+def test_public_static_paths_respect_methods():
+    from app.backend.app.auth import build_public_static_paths
+
+    client, _ = _client()
+    paths = build_public_static_paths(client.app)
+    assert paths == {"/open": frozenset({"POST"})}
+
+    assert client.post("/open").json() == {"open": True}
+    assert client.get("/open", follow_redirects=False).status_code == 302
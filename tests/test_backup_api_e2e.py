@@ -26,6 +26,10 @@ def test_backup_list_create_and_delete(app_client):
     r3 = app_client.delete(f"/api/backup/{folder_name}")
     assert r3.status_code == 200
 
+    # The cached listing must not keep showing it
+    names = [b.get("file") for b in app_client.get("/api/backup").json()["backups"]]
+    assert folder_name not in names
+
 
 def test_monthly_backup_create_and_download(app_client):
     y = date.today().year
@@ -43,3 +47,41 @@ def test_monthly_backup_create_and_download(app_client):
     )
 
 
+def test_restore_full_backup_unpacks_monthly_files(app_client):
+    r1 = app_client.post("/api/backup/create")
+    assert r1.status_code == 200, r1.text
+    zip_name = r1.json()["file"]
+
+    r2 = app_client.post(f"/api/backup/restore/{zip_name}")
+    assert r2.status_code == 200, r2.text
+
+    names = [b.get("file") for b in app_client.get("/api/backup").json()["backups"]]
+    today = date.today()
+    assert f"monthly_backup_{today.year}_{today.month:02d}.xlsx" in names
+
+    assert app_client.delete(f"/api/backup/{zip_name}").status_code == 200
+
+
+def test_restore_with_corrupt_member_keeps_existing_file(app_client):
+    import zipfile
+    from app.backend.app.services.backup_service import BACKUP_DIR, EXCEL_ROOT
+
+    target = EXCEL_ROOT / "pytest_restore_target.xlsx"
+    target.write_bytes(b"good workbook")
+    zip_path = BACKUP_DIR / "pytest_corrupt.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr(target.name, b"z" * 4096)
+    # Flip payload bytes so the member only fails its CRC check once fully read
+    raw = bytearray(zip_path.read_bytes())
+    start = raw.index(b"z" * 4096) + 2048
+    raw[start:start + 10] = b"y" * 10
+    zip_path.write_bytes(bytes(raw))
+
+    try:
+        r = app_client.post(f"/api/backup/restore/{zip_path.name}")
+        assert r.status_code == 500
+        assert target.read_bytes() == b"good workbook"
+        assert not (EXCEL_ROOT / f".{target.name}.tmp").exists()
+    finally:
+        zip_path.unlink(missing_ok=True)
+        target.unlink(missing_ok=True)
@@ -0,0 +1,11 @@
+def test_large_responses_are_gzipped(app_client):
+    r = app_client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers.get("content-encoding") == "gzip"
+    assert "paths" in r.json()
+
+
+def test_small_responses_are_not_compressed(app_client):
+    r = app_client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
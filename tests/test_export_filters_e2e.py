@@ -1,5 +1,8 @@
+import io
 from datetime import date
 
+from openpyxl import load_workbook
+
 
 def _create_tx(app_client, cat_id, usr_id, amount, notes, account_id=None, tags=None, date_str=None):
     payload = {
@@ -30,6 +33,12 @@ def test_export_filters_and_sorts(app_client, db_conn):
         params={"tags": "tagA"},
     )
     assert r1.status_code == 200
+    ws = load_workbook(io.BytesIO(r1.content))["Transactions"]
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0][:3] == ("ID", "Date", "Amount")
+    exported_ids = [r[0] for r in rows[1:]]
+    assert tx1 in exported_ids
+    assert tx2 not in exported_ids
 
     # Filter by amount_min should include only tx2
     r2 = app_client.get(
@@ -50,3 +59,21 @@ def test_export_filters_and_sorts(app_client, db_conn):
     app_client.delete(f"/api/transactions/{tx2}")
 
 
+def test_export_tag_filter_follows_tag_updates(app_client, db_conn):
+    cat_id = db_conn.execute("SELECT id FROM categories ORDER BY id LIMIT 1").fetchone()[0]
+    usr_id = db_conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+    tx = _create_tx(app_client, cat_id, usr_id, 20.0, "pytest-exp-tags", tags="oldTag")
+
+    def exported_ids(tag):
+        r = app_client.get("/api/transactions/export", params={"tags": tag})
+        assert r.status_code == 200
+        ws = load_workbook(io.BytesIO(r.content))["Transactions"]
+        return [row[0] for row in list(ws.iter_rows(values_only=True))[1:]]
+
+    assert tx in exported_ids("oldTag")
+    assert app_client.put(f"/api/transactions/{tx}", json={"tags": "newTag,other"}).status_code == 200
+    assert tx not in exported_ids("oldTag")
+    assert tx in exported_ids("newTag")
+
+    app_client.delete(f"/api/transactions/{tx}")
+    assert tx not in exported_ids("newTag")
@@ -0,0 +1,21 @@
+import logging
+import uuid
+
+
+def test_server_log_written_after_second_startup(app_client):
+    from fastapi.testclient import TestClient
+    import app.backend.app.main as main_app
+    from app.backend.app.services.logging_service import start_log_listeners
+
+    marker = f"pytest-lifecycle-{uuid.uuid4().hex}"
+    try:
+        with TestClient(main_app.app):
+            pass
+        # Second lifespan in the same process: shutdown stopped the writers above
+        with TestClient(main_app.app):
+            logging.getLogger("app.lifecycle_test").error(marker)
+        # Shutdown drains the queue, so the record is on disk by now
+        assert marker in (main_app.LOG_DIR / "server.log").read_text(encoding="utf-8")
+    finally:
+        # Later tests log without running the lifespan hooks
+        start_log_listeners()
@@ -74,3 +74,24 @@ def test_recurrences_filters_and_inline_toggle(app_client, db_conn):
     assert d.status_code == 200
 
 
+def test_list_recurrences_matches_created(app_client, db_conn):
+    cat_id = db_conn.execute("SELECT id FROM categories ORDER BY id LIMIT 1").fetchone()[0]
+    usr_id = db_conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+    payload = {
+        "name": "pytest-rec-list",
+        "amount": 12.5,
+        "category_id": cat_id,
+        "user_id": usr_id,
+        "frequency": "weekly",
+        "weekday": 2,
+        "active": False,
+    }
+    created = app_client.post("/api/recurrences", json=payload).json()
+
+    r = app_client.get("/api/recurrences")
+    assert r.status_code == 200
+    listed = {rec["id"]: rec for rec in r.json()}
+    assert listed[created["id"]] == created
+    assert listed[created["id"]]["active"] is False
+
+    app_client.delete(f"/api/recurrences/{created['id']}")
@@ -58,3 +58,30 @@ def test_system_apply_created_something(app_client, db_conn):
     # We don't assert >0 to avoid flakiness across DB snapshots
 
 
+def test_apply_recurring_catch_up_honours_skips_and_existing(app_client, db_conn):
+    from app.backend.app import recurrence
+
+    cat_id = db_conn.execute("SELECT id FROM categories ORDER BY id LIMIT 1").fetchone()[0]
+    usr_id = db_conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+    cur = db_conn.execute(
+        "INSERT INTO recurrences (name, amount, category_id, user_id, frequency, day_of_month, next_charge_date, active) VALUES (?,?,?,?,?,?,?,1)",
+        ("pytest-catch-up", 20.0, cat_id, usr_id, "monthly", 31, "2020-01-31"),
+    )
+    rec_id = cur.lastrowid
+    db_conn.execute(
+        "INSERT INTO recurrence_skips (recurrence_id, period_key) VALUES (?, ?)", (rec_id, "2020-02-29")
+    )
+    db_conn.execute(
+        "INSERT INTO transactions (date, amount, category_id, user_id, recurrence_id, period_key) VALUES (?,?,?,?,?,?)",
+        ("2020-03-31", -20.0, cat_id, usr_id, rec_id, "2020-03-31"),
+    )
+    db_conn.commit()
+
+    recurrence.apply_recurring(today=date(2020, 5, 15))
+
+    keys = [r[0] for r in db_conn.execute(
+        "SELECT period_key FROM transactions WHERE recurrence_id = ? ORDER BY period_key", (rec_id,)
+    )]
+    assert keys == ["2020-01-31", "2020-03-31", "2020-04-30"]
+    next_due = db_conn.execute("SELECT next_charge_date FROM recurrences WHERE id = ?", (rec_id,)).fetchone()[0]
+    assert next_due == "2020-05-31"
@@ -0,0 +1,58 @@
+from datetime import date
+
+
+def _get_or_create(conn, table, name):
+    row = conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()
+    if row:
+        return row["id"]
+    cur = conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,))
+    conn.commit()
+    return cur.lastrowid
+
+
+def test_matrix_structure(app_client):
+    res = app_client.get("/api/statistics/matrix")
+    assert res.status_code == 200
+    body = res.json()
+
+    assert len(body["months"]) == 6
+    assert body["months"][-1] == date.today().strftime("%Y-%m")
+    assert "total" in body["values"]
+    for cat in body["categories"]:
+        assert len(body["values"][cat]) == 6
+
+
+def test_matrix_matches_monthly_endpoint(app_client, db_conn):
+    user_id = _get_or_create(db_conn, "users", "Yosef")
+    category_id = _get_or_create(db_conn, "categories", "בדיקת-מטריצה")
+
+    db_conn.execute(
+        "INSERT INTO transactions (date, amount, category_id, user_id, notes) VALUES (?, ?, ?, ?, ?)",
+        (date.today().isoformat(), -42.0, category_id, user_id, "matrix"),
+    )
+    db_conn.commit()
+    app_client.post("/api/statistics/clear-cache")
+
+    matrix = app_client.get("/api/statistics/matrix").json()
+    assert matrix["values"]["בדיקת-מטריצה"][-1] >= 42.0
+
+    for category in ("total", "בדיקת-מטריצה"):
+        monthly = app_client.get("/api/statistics/monthly", params={"category": category}).json()
+        assert [m["ym"] for m in monthly] == matrix["months"]
+        assert [m["expenses"] for m in monthly] == matrix["values"][category]
+
+
+def test_matrix_sees_writes_outside_the_api(app_client, db_conn):
+    user_id = _get_or_create(db_conn, "users", "Yosef")
+    category_id = _get_or_create(db_conn, "categories", "בדיקת-גרסה")
+    before = app_client.get("/api/statistics/monthly", params={"category": "בדיקת-גרסה"}).json()
+
+    # Direct insert, like the partials and form routes: no cache invalidation call
+    db_conn.execute(
+        "INSERT INTO transactions (date, amount, category_id, user_id, notes) VALUES (?, ?, ?, ?, ?)",
+        (date.today().isoformat(), -17.0, category_id, user_id, "matrix-version"),
+    )
+    db_conn.commit()
+
+    after = app_client.get("/api/statistics/monthly", params={"category": "בדיקת-גרסה"}).json()
+    assert after[-1]["expenses"] == before[-1]["expenses"] + 17.0
@@ -159,3 +159,131 @@ def test_transactions_inline_row_partial_routes(app_client, db_conn):
     assert row_del.status_code == 200
 
 
+def test_list_transactions_keyset_pagination(app_client, db_conn):
+    cat_id = db_conn.execute("SELECT id FROM categories ORDER BY id LIMIT 1").fetchone()[0]
+    usr_id = db_conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+
+    created_ids = []
+    for i in range(3):
+        r = app_client.post("/api/transactions", json={
+            "date": "2001-01-0%d" % (i + 1),
+            "amount": 10 + i,
+            "category_id": cat_id,
+            "user_id": usr_id,
+            "notes": "pytest-page",
+        })
+        assert r.status_code == 200, r.text
+        created_ids.append(r.json()["id"])
+
+    params = {"from_date": "2001-01-01", "to_date": "2001-01-31", "limit": 2}
+    first = app_client.get("/api/transactions", params=params)
+    assert first.status_code == 200
+    page1 = first.json()
+    assert [t["id"] for t in page1] == [created_ids[2], created_ids[1]]
+
+    last = page1[-1]
+    second = app_client.get("/api/transactions", params={
+        **params, "before_date": last["date"], "before_id": last["id"],
+    })
+    assert second.status_code == 200
+    assert [t["id"] for t in second.json()] == [created_ids[0]]
+
+    # A cursor needs both halves
+    bad = app_client.get("/api/transactions", params={**params, "before_id": last["id"]})
+    assert bad.status_code == 400
+
+    for tx_id in created_ids:
+        assert app_client.delete(f"/api/transactions/{tx_id}").status_code == 200
+
+
+def test_update_amount_keeps_sign_of_stored_category(app_client, db_conn):
+    usr_id = db_conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+    income_id = db_conn.execute("SELECT id FROM categories WHERE name = 'משכורת'").fetchone()[0]
+    expense_id = db_conn.execute(
+        "SELECT id FROM categories WHERE name NOT IN ('משכורת','קליניקה') ORDER BY id LIMIT 1"
+    ).fetchone()[0]
+
+    ids = []
+    for cat_id in (income_id, expense_id):
+        r = app_client.post("/api/transactions", json={
+            "date": date.today().isoformat(),
+            "amount": 10,
+            "category_id": cat_id,
+            "user_id": usr_id,
+            "notes": "pytest-sign",
+        })
+        assert r.status_code == 200, r.text
+        ids.append(r.json()["id"])
+
+    # Amount-only update: sign follows the category already stored on the row
+    income_upd = app_client.put(f"/api/transactions/{ids[0]}", json={"amount": -20})
+    expense_upd = app_client.put(f"/api/transactions/{ids[1]}", json={"amount": 20})
+    assert income_upd.json()["amount"] == 20
+    assert expense_upd.json()["amount"] == -20
+
+    for tx_id in ids:
+        assert app_client.delete(f"/api/transactions/{tx_id}").status_code == 200
+
+
+def test_duplicate_missing_transaction_returns_404(app_client, db_conn):
+    max_id = db_conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+    r = app_client.post(f"/api/transactions/{max_id + 1000}/duplicate")
+    assert r.status_code == 404
+
+
+def test_bulk_create_transactions(app_client, db_conn):
+    usr_id = db_conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+    income_id = db_conn.execute("SELECT id FROM categories WHERE name = 'משכורת'").fetchone()[0]
+    expense_id = db_conn.execute(
+        "SELECT id FROM categories WHERE name NOT IN ('משכורת','קליניקה') ORDER BY id LIMIT 1"
+    ).fetchone()[0]
+
+    payload = [
+        {"date": date.today().isoformat(), "amount": 11, "category_id": income_id,
+         "user_id": usr_id, "notes": "pytest-bulk"},
+        {"date": date.today().isoformat(), "amount": 12, "category_id": expense_id,
+         "user_id": usr_id, "notes": "pytest-bulk"},
+    ]
+    r = app_client.post("/api/transactions/bulk", json=payload)
+    assert r.status_code == 200, r.text
+    assert r.json() == {"created": 2}
+
+    rows = db_conn.execute(
+        "SELECT id, amount FROM transactions WHERE notes = 'pytest-bulk' ORDER BY id"
+    ).fetchall()
+    assert [row["amount"] for row in rows] == [11, -12]
+
+    assert app_client.post("/api/transactions/bulk", json=[]).status_code == 400
+
+    for row in rows:
+        assert app_client.delete(f"/api/transactions/{row['id']}").status_code == 200
+
+
+def test_list_transactions_etag_revalidation(app_client, db_conn):
+    params = {"limit": 5}
+    first = app_client.get("/api/transactions", params=params)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = app_client.get("/api/transactions", params=params, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    # Different query -> different tag
+    other = app_client.get("/api/transactions", params={"limit": 6})
+    assert other.headers["etag"] != etag
+
+    # Any write, even outside the API, changes the tag
+    usr_id = db_conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+    cat_id = db_conn.execute("SELECT id FROM categories ORDER BY id LIMIT 1").fetchone()[0]
+    cur = db_conn.execute(
+        "INSERT INTO transactions (date, amount, category_id, user_id, notes) VALUES (?, ?, ?, ?, ?)",
+        (date.today().isoformat(), -1.0, cat_id, usr_id, "pytest-etag"),
+    )
+    db_conn.commit()
+    fresh = app_client.get("/api/transactions", params=params, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+
+    db_conn.execute("DELETE FROM transactions WHERE id = ?", (cur.lastrowid,))
+    db_conn.commit()